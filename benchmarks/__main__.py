@@ -0,0 +1,4 @@
+import sys
+from benchmarks.run_benchmarks import main
+
+sys.exit(main())
@@ -0,0 +1,58 @@
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+from benchmarks.timing import time_per_call
+
+"""
+Benchmark of the time taken per convex polygon by the 'exact' and 'hull' convex modes of ConvexPolygonGenerator, for
+the numbers of vertices the GUI allows (3 to 99).
+
+The 'hull' mode gets so slow as the number of vertices grows that it stops being timed once a polygon takes longer
+than hull_time_limit seconds, or once it raises ValueError for more vertices than the image fits in that mode, see
+get_most_convex_vertices, or after max_hull_retries added points.
+
+Run from the root of the project with:
+python -m benchmarks.bench_convex_polygon
+"""
+
+numbers_of_vertices = [3, 4, 5, 6, 8, 10, 12, 14, 16, 20, 30, 40, 50, 60, 70, 80, 90, 99]
+image_height = 480
+image_width = 480
+batch_size = 256
+hull_time_limit = 0.005
+
+
+def main():
+    convex_polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                                      image_width=image_width,
+                                                      number_of_vertices=5,
+                                                      seed=0)
+
+    print(f'{image_height}x{image_width} images, time per polygon in ms')
+    print(f'{"vertices":>8} {"hull":>10} {"exact":>10} {"exact batch":>12}')
+    time_hull = True
+    for number_of_vertices in numbers_of_vertices:
+        hull_result = '-'
+        if time_hull:
+            convex_polygon_generator.set_convex_mode('hull')
+            try:
+                hull_seconds = time_per_call(
+                    lambda: convex_polygon_generator.generate_polygon(number_of_vertices=number_of_vertices))
+            except ValueError:
+                hull_result = 'gave up'
+                time_hull = False
+            else:
+                hull_result = f'{hull_seconds * 1e3:.3f}'
+                time_hull = hull_seconds < hull_time_limit
+
+        convex_polygon_generator.set_convex_mode('exact')
+        exact_seconds = time_per_call(
+            lambda: convex_polygon_generator.generate_polygon(number_of_vertices=number_of_vertices))
+        exact_batch_seconds = time_per_call(
+            lambda: convex_polygon_generator.generate_batch(number_of_images=batch_size,
+                                                            number_of_vertices=number_of_vertices)) / batch_size
+
+        print(f'{number_of_vertices:>8} {hull_result:>10} {exact_seconds * 1e3:>10.3f} '
+              f'{exact_batch_seconds * 1e3:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
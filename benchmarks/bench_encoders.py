@@ -0,0 +1,97 @@
+import os
+import tempfile
+import numpy as np
+import cv2
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+from polygon_generator.encoder import ImageEncoder
+from benchmarks.timing import time_per_call
+
+"""
+Benchmark of the bytes and encode time per image of each file format and encoder setting, to pick the cheapest format
+for a storage and cpu budget. The images are black polygons on white drawn with the default anti aliased rasterizer,
+as 3 channel colour images and as single channel grey images (see PolygonGenerator.set_canvas_mode). 'lossless' is
+whether the image read back from the file is the image drawn.
+
+Run from the root of the project with:
+python -m benchmarks.bench_encoders
+"""
+
+image_height = 256
+image_width = 256
+number_of_vertices = 6
+number_of_images = 16
+
+# (file format, description, encoder)
+encoders = [
+    ('bmp', 'default', ImageEncoder()),
+    ('png', 'compression 1', ImageEncoder(png_compression=1)),
+    ('png', 'compression 3', ImageEncoder(png_compression=3)),
+    ('png', 'compression 9', ImageEncoder(png_compression=9)),
+    ('png', 'compression 1 rle', ImageEncoder(png_compression=1, png_strategy='rle')),
+    ('png', 'compression 9 rle', ImageEncoder(png_compression=9, png_strategy='rle')),
+    ('png', 'compression 3 huffman', ImageEncoder(png_compression=3, png_strategy='huffman_only')),
+    ('png', 'bilevel', ImageEncoder(bilevel=True)),
+    ('jpg', 'quality 95', ImageEncoder(jpeg_quality=95)),
+    ('jpg', 'quality 75', ImageEncoder(jpeg_quality=75)),
+    ('jpg', 'quality 95 optimize', ImageEncoder(jpeg_quality=95, jpeg_optimize=True)),
+    ('webp', 'quality 90', ImageEncoder(webp_quality=90)),
+    ('webp', 'lossless', ImageEncoder(webp_lossless=True)),
+    ('tiff', 'lzw', ImageEncoder(tiff_compression='lzw')),
+    ('tiff', 'packbits', ImageEncoder(tiff_compression='packbits')),
+    ('tiff', 'deflate', ImageEncoder(tiff_compression='deflate')),
+    ('tiff', 'bilevel packbits', ImageEncoder(tiff_compression='packbits', bilevel=True)),
+]
+
+
+def is_lossless(image_encoder: ImageEncoder,
+                file_format: str,
+                images,
+                ):
+    """
+    :return: bool, every image reads back from its encoded file the same as it was drawn
+    """
+    for image in images:
+        decoded_image = cv2.imdecode(image_encoder.encode(image, file_format), cv2.IMREAD_UNCHANGED)
+        if decoded_image.ndim != image.ndim:
+            decoded_image = cv2.cvtColor(decoded_image, cv2.COLOR_BGR2GRAY if image.ndim == 2 else cv2.COLOR_GRAY2BGR)
+        if not np.array_equal(decoded_image, image):
+            return False
+
+    return True
+
+
+def main():
+    polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                               image_width=image_width,
+                                               number_of_vertices=number_of_vertices,
+                                               seed=0)
+    canvases = {}
+    for canvas_mode in ('colour', 'grey'):
+        polygon_generator.set_canvas_mode(canvas_mode)
+        canvases[canvas_mode], batch_vertices = polygon_generator.generate_batch(number_of_images=number_of_images,
+                                                                                 first_image_index=0)
+
+    print(f'{image_height}x{image_width} images of {number_of_vertices} sided polygons, mean of {number_of_images}')
+    print(f'{"format":>6} {"settings":<22} {"canvas":<7} {"bytes/image":>12} {"encode us/image":>16} '
+          f'{"write us/image":>15} {"lossless":>9}')
+    with tempfile.TemporaryDirectory() as folder_path:
+        for file_format, description, image_encoder in encoders:
+            if not cv2.haveImageWriter(f'.{file_format}'):
+                continue
+            path_to_save_image = os.path.join(folder_path, f'benchmark_image.{file_format}')
+            for canvas_mode, images in canvases.items():
+                bytes_per_image = np.mean([len(image_encoder.encode(image, file_format)) for image in images])
+                encode_seconds = time_per_call(lambda: [image_encoder.encode(image, file_format)
+                                                        for image in images]) / number_of_images
+                write_seconds = time_per_call(lambda: [image_encoder.write(path_to_save_image, image)
+                                                       for image in images]) / number_of_images
+                lossless = is_lossless(image_encoder=image_encoder,
+                                       file_format=file_format,
+                                       images=images)
+
+                print(f'{file_format:>6} {description:<22} {canvas_mode:<7} {bytes_per_image:>12.0f} '
+                      f'{encode_seconds * 1e6:>16.1f} {write_seconds * 1e6:>15.1f} {str(lossless):>9}')
+
+
+if __name__ == '__main__':
+    main()
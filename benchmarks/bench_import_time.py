@@ -0,0 +1,69 @@
+import sys
+import statistics
+import subprocess
+
+"""
+Benchmark of the cold start import time of the polygon_generator modules, as a new worker process would see it. Each
+import runs in a fresh interpreter, and the time taken by numpy and cv2 alone is shown for comparison. Also checks
+that none of the modules pull in a GUI toolkit.
+
+Run from the root of the project with:
+python -m benchmarks.bench_import_time
+"""
+
+modules_to_import = [
+    'numpy, cv2',
+    'polygon_generator.folder',
+    'polygon_generator.polygon_generator',
+    'polygon_generator.dataset_generator',
+    'polygon_generator.packed_dataset',
+    'polygon_generator.rasterizer',
+    'polygon_generator.scene_generator',
+    'polygon_generator.labels',
+    'polygon_generator.dataset_cache',
+    'polygon_generator.polygon_geometry',
+    'polygon_generator.lazy_dataset',
+    'polygon_generator.cli',
+    'polygon_generator.parameter_sweep',
+    'polygon_generator.encoder',
+]
+gui_modules = ['tkinter', 'PyQt5']
+number_of_runs = 10
+
+timing_script = '''
+import sys
+import time
+start = time.perf_counter()
+import {modules}
+seconds = time.perf_counter() - start
+gui_modules = [module for module in {gui_modules} if module in sys.modules]
+print(seconds, ','.join(gui_modules))
+'''
+
+
+def time_import(modules: str):
+    """
+    Import modules in a fresh interpreter
+
+    :param str, modules: comma separated modules to import
+    :return: (float, list), (seconds, gui_modules_imported)
+    """
+    output = subprocess.run([sys.executable, '-c', timing_script.format(modules=modules, gui_modules=gui_modules)],
+                            capture_output=True, text=True, check=True).stdout.split()
+    gui_modules_imported = output[1].split(',') if len(output) > 1 else []
+
+    return float(output[0]), gui_modules_imported
+
+
+def main():
+    print(f'{"modules":<40} {"median (ms)":>12} {"min (ms)":>10}  gui modules imported')
+    for modules in modules_to_import:
+        runs = [time_import(modules) for number in range(number_of_runs)]
+        seconds = [run[0] for run in runs]
+        gui_modules_imported = runs[0][1]
+        print(f'{modules:<40} {statistics.median(seconds) * 1e3:>12.1f} {min(seconds) * 1e3:>10.1f}  '
+              f'{", ".join(gui_modules_imported) or "none"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import timeit
+import numpy as np
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+from benchmarks.timing import time_per_call
+
+"""
+Micro-benchmark comparing the template based PolygonGenerator.reset_image with the per-pixel loop it replaced.
+
+Run from the root of the project with:
+python -m benchmarks.bench_reset_image
+"""
+
+image_sizes = [(64, 64), (256, 256), (512, 512), (1024, 1024)]
+
+
+def loop_reset_image(image_height: int,
+                     image_width: int,
+                     background_colour: tuple,
+                     ):
+    """
+    The original reset_image, which fills the canvas one pixel at a time
+
+    :param int, image_height:
+    :param int, image_width:
+    :param tuple, background_colour: colour to fill the canvas with, as (b, g, r)
+    :return: np.ndarray, image: the filled canvas
+    """
+    image = np.zeros((image_height, image_width, 3), np.uint8)
+
+    for height_idx, col in enumerate(image):
+        for row_idx, pixel in enumerate(col):
+            image[height_idx][row_idx][0] = background_colour[0]
+            image[height_idx][row_idx][1] = background_colour[1]
+            image[height_idx][row_idx][2] = background_colour[2]
+
+    return image
+
+
+def main():
+    print(f'{"size":>11} {"loop (ms)":>12} {"template (ms)":>14} {"speedup":>9}')
+    for image_height, image_width in image_sizes:
+        polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                                   image_width=image_width,
+                                                   number_of_vertices=5)
+        background_colour = polygon_generator.background_colour
+
+        # the loop is slow enough at larger sizes that a single call is a good enough measurement
+        loop_seconds = timeit.timeit(lambda: loop_reset_image(image_height=image_height,
+                                                              image_width=image_width,
+                                                              background_colour=background_colour),
+                                     number=1)
+        template_seconds = time_per_call(polygon_generator.reset_image)
+
+        print(f'{image_height:>5}x{image_width:<5} {loop_seconds * 1e3:>12.3f} {template_seconds * 1e3:>14.4f} '
+              f'{loop_seconds / template_seconds:>8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
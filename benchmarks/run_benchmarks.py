@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import platform
+import argparse
+import tempfile
+import numpy as np
+import cv2
+from polygon_generator.polygon_generator import ConvexPolygonGenerator, ConcavePolygonGenerator
+from polygon_generator.folder import save_image_to_folder
+from polygon_generator.rasterizer import Rasterizer, rasterizer_modes
+from benchmarks.timing import time_per_call
+
+"""
+Benchmark suite covering the hot paths of polygon_generator over a matrix of image sizes and numbers of vertices.
+Results are written as json, and can be compared against a saved baseline to catch regressions.
+
+Run from the root of the project with:
+python -m benchmarks --output results.json
+and later, to compare against those results:
+python -m benchmarks --baseline results.json
+Add --quick for a smaller matrix.
+
+The command exits with status 1 if any benchmark is slower than the baseline by more than the threshold.
+"""
+
+image_sizes = [(64, 64), (256, 256), (1024, 1024)]
+numbers_of_vertices = [3, 10, 50, 99]
+file_formats = ['jpg', 'png', 'bmp', 'tiff', 'webp']
+
+quick_image_sizes = [(64, 64), (256, 256)]
+quick_numbers_of_vertices = [5, 20]
+
+# the 'hull' convex mode gets too slow to time above this many vertices
+hull_max_number_of_vertices = 10
+
+# number of polygons generate_geometry makes in each call
+geometry_number_of_polygons = 100
+
+
+def get_polygon_generators(image_height: int,
+                           image_width: int,
+                           number_of_vertices: int,
+                           ):
+    """
+    Get a polygon generator for each way of drawing a polygon that can draw number_of_vertices vertices
+
+    :return: dict, polygon_generators: with keys like 'convex_exact' and 'concave_star'
+    """
+    polygon_generators = {}
+    for convex_mode in ('exact', 'hull'):
+        if convex_mode == 'hull' and number_of_vertices > hull_max_number_of_vertices:
+            continue
+        convex_polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                                          image_width=image_width,
+                                                          number_of_vertices=number_of_vertices,
+                                                          seed=0)
+        convex_polygon_generator.set_convex_mode(convex_mode)
+        polygon_generators[f'convex_{convex_mode}'] = convex_polygon_generator
+
+    for concave_mode in ('angle', 'star', 'two_opt'):
+        concave_polygon_generator = ConcavePolygonGenerator(image_height=image_height,
+                                                            image_width=image_width,
+                                                            number_of_vertices=number_of_vertices,
+                                                            seed=0)
+        concave_polygon_generator.set_concave_mode(concave_mode)
+        polygon_generators[f'concave_{concave_mode}'] = concave_polygon_generator
+
+    return polygon_generators
+
+
+def run_benchmarks(image_sizes: list,
+                   numbers_of_vertices: list,
+                   file_formats: list,
+                   number_of_repeats: int = 3,
+                   ):
+    """
+    :return: list, results: dicts of the benchmark name, its parameters and the seconds_per_call
+    """
+    results = []
+
+    def record(name, parameters, function):
+        seconds_per_call = time_per_call(function, number_of_repeats=number_of_repeats)
+        results.append({'name': name, 'parameters': parameters, 'seconds_per_call': seconds_per_call})
+        print(f'{name:<26} {format_parameters(parameters):<72} {seconds_per_call * 1e6:>12.1f} us', flush=True)
+
+    for image_height, image_width in image_sizes:
+        size_parameters = {'image_height': image_height, 'image_width': image_width}
+        size_polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                                        image_width=image_width,
+                                                        number_of_vertices=5,
+                                                        seed=0)
+        record('reset_image', size_parameters, size_polygon_generator.reset_image)
+
+        rasterizer_vertices = size_polygon_generator.get_convex_polygon(
+            polygon_vertices=size_polygon_generator.generate_n_random_points(),
+            number_of_vertices=size_polygon_generator.number_of_vertices)
+        for rasterizer_mode in rasterizer_modes:
+            rasterizer = Rasterizer(rasterizer_mode=rasterizer_mode)
+            record('fill_polygon', dict(size_parameters, rasterizer_mode=rasterizer_mode),
+                   lambda: rasterizer.fill_polygon(image=size_polygon_generator.image,
+                                                   polygon_vertices=rasterizer_vertices,
+                                                   colour=size_polygon_generator.shape_colour,
+                                                   is_convex=True))
+
+        for number_of_vertices in numbers_of_vertices:
+            polygon_generators = get_polygon_generators(image_height=image_height,
+                                                        image_width=image_width,
+                                                        number_of_vertices=number_of_vertices)
+            record('generate_n_random_points', dict(size_parameters, number_of_vertices=number_of_vertices),
+                   lambda: size_polygon_generator.generate_n_random_points(number_of_vertices=number_of_vertices))
+
+            for generator_name, polygon_generator in polygon_generators.items():
+                parameters = dict(size_parameters, number_of_vertices=number_of_vertices, generator=generator_name)
+                polygon_vertices = polygon_generator.generate_n_random_points(number_of_vertices=number_of_vertices)
+                record('draw_polygon', parameters,
+                       lambda: polygon_generator.draw_polygon(polygon_vertices=polygon_vertices,
+                                                              number_of_vertices=number_of_vertices))
+                record('generate_polygon', parameters,
+                       lambda: polygon_generator.generate_polygon(number_of_vertices=number_of_vertices))
+                polygon_generator.set_reuse_image(True)
+                record('generate_polygon', dict(parameters, reuse_image=True),
+                       lambda: polygon_generator.generate_polygon(number_of_vertices=number_of_vertices))
+                polygon_generator.set_reuse_image(False)
+                record('generate_geometry', dict(parameters, number_of_polygons=geometry_number_of_polygons),
+                       lambda: polygon_generator.generate_geometry(number_of_polygons=geometry_number_of_polygons,
+                                                                   number_of_vertices=number_of_vertices))
+
+        image = size_polygon_generator.generate_polygon()
+        with tempfile.TemporaryDirectory() as folder_path:
+            for file_format in file_formats:
+                if not cv2.haveImageWriter(f'.{file_format}'):
+                    continue
+                record('save_image_to_folder', dict(size_parameters, file_format=file_format),
+                       lambda: save_image_to_folder(folder_path=folder_path,
+                                                    image_name='benchmark_image',
+                                                    image=image,
+                                                    file_format=file_format))
+
+    return results
+
+
+def format_parameters(parameters: dict):
+    return ' '.join(f'{key}={value}' for key, value in parameters.items())
+
+
+def get_result_key(result: dict):
+    return result['name'], format_parameters(dict(sorted(result['parameters'].items())))
+
+
+def compare_results(results: list,
+                    baseline_results: list,
+                    threshold: float,
+                    ):
+    """
+    Compare results to the baseline, printing the ratio of the time taken to the baseline's for each benchmark in both
+
+    :param list, results:
+    :param list, baseline_results:
+    :param float, threshold: a benchmark is a regression if it takes more than threshold times the baseline's time
+    :return: list, regressions: (name, parameters, ratio) of each regression
+    """
+    baseline_seconds = {get_result_key(result): result['seconds_per_call'] for result in baseline_results}
+    regressions = []
+
+    print(f'\n{"benchmark":<26} {"parameters":<72} {"ratio to baseline":>18}')
+    for result in results:
+        key = get_result_key(result)
+        if key not in baseline_seconds:
+            continue
+        ratio = result['seconds_per_call'] / baseline_seconds[key]
+        is_regression = ratio > threshold
+        if is_regression:
+            regressions.append((key[0], key[1], ratio))
+        print(f'{key[0]:<26} {key[1]:<72} {ratio:>17.2f}x{"  REGRESSION" if is_regression else ""}')
+
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of polygon_generator')
+    parser.add_argument('--output', help='path to save the results to as json')
+    parser.add_argument('--baseline', help='path of saved results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slow down relative to the baseline counted as a regression (default 1.25)')
+    parser.add_argument('--quick', action='store_true', help='run a smaller matrix of sizes and numbers of vertices')
+    parser.add_argument('--repeats', type=int, default=3, help='number of times to time each benchmark (default 3)')
+    arguments = parser.parse_args(arguments)
+
+    results = run_benchmarks(image_sizes=quick_image_sizes if arguments.quick else image_sizes,
+                             numbers_of_vertices=quick_numbers_of_vertices if arguments.quick else numbers_of_vertices,
+                             file_formats=file_formats,
+                             number_of_repeats=arguments.repeats)
+
+    if arguments.output is not None:
+        output = {
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'opencv': cv2.__version__,
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+            },
+            'results': results,
+        }
+        with open(arguments.output, 'w') as output_file:
+            json.dump(output, output_file, indent=4)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as baseline_file:
+            baseline_results = json.load(baseline_file)['results']
+        regressions = compare_results(results=results,
+                                      baseline_results=baseline_results,
+                                      threshold=arguments.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regressions slower than {arguments.threshold}x the baseline')
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
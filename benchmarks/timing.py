@@ -0,0 +1,19 @@
+import timeit
+
+
+def time_per_call(function,
+                  number_of_repeats: int = 1,
+                  ):
+    """
+    Time a function, repeating it until the total time taken is at least 0.2 seconds. With more than one repeat the
+    fastest repeat is used, as it is the least disturbed by anything else running.
+
+    :param function: function taking no arguments
+    :param int, number_of_repeats: number of times to time the function
+    :return: float, seconds per call
+    """
+    timer = timeit.Timer(function)
+    number_of_calls, total_seconds = timer.autorange()
+    repeat_seconds = [total_seconds] + timer.repeat(repeat=number_of_repeats - 1, number=number_of_calls)
+
+    return min(repeat_seconds) / number_of_calls
@@ -0,0 +1,370 @@
+import os
+import sys
+import math
+import time
+import argparse
+from polygon_generator.polygon_generator import ConvexPolygonGenerator, ConcavePolygonGenerator, canvas_modes, \
+    convex_modes, concave_modes, get_most_convex_vertices, get_most_reflex_vertices
+from polygon_generator.rasterizer import rasterizer_modes
+from polygon_generator.dataset_generator import DatasetGenerator
+from polygon_generator.packed_dataset import NpyDatasetSink, TarShardSink
+from polygon_generator.encoder import ImageEncoder, png_strategies, tiff_compressions
+
+"""
+Command line entry point to generate datasets on machines without a display, installed as the polygongenerator
+command by setup.py, or run with python -m polygon_generator.cli:
+polygongenerator --output convex_dataset --number-of-images 100000 --vertices 5-8 --workers 8 --seed 0
+
+A range of vertices makes one dataset per number of vertices, each in its own vertices_{n} folder of the output.
+Progress is printed to stderr as the images are made, after each batch for the tar and npy sinks and after each shard
+for the folder sink, and a summary of the throughput at the end.
+
+Sinks:
+folder: one image file per image in shard folders with their COCO annotations, made over a pool of workers and
+ resumable, see dataset_generator
+tar: encoded images packed into tar files, see packed_dataset.TarShardSink
+npy: unencoded images in one memory mapped .npy array, see packed_dataset.NpyDatasetSink
+"""
+
+sinks = ('folder', 'tar', 'npy')
+polygon_types = ('convex', 'concave')
+
+# by default each dataset is split into about this many shards, so the folder sink, which reports its progress as each
+#  shard is completed, reports it every percent or so
+default_number_of_shards = 100
+max_images_per_shard = 1000
+
+
+def parse_colour(colour: str):
+    """
+    :param str, colour: colour as 'b,g,r'
+    :return: tuple, (b, g, r)
+    """
+    channels = tuple(int(channel) for channel in colour.split(','))
+    if len(channels) != 3 or not all(0 <= channel <= 255 for channel in channels):
+        raise argparse.ArgumentTypeError(f'colour must be three values from 0 to 255 as b,g,r, got {colour!r}')
+
+    return channels
+
+
+def parse_vertices(vertices: str):
+    """
+    :param str, vertices: a number of vertices such as '6', or an inclusive range such as '3-8'
+    :return: range, numbers_of_vertices
+    """
+    first, _, last = vertices.partition('-')
+    try:
+        numbers_of_vertices = range(int(first), int(last or first) + 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'vertices must be a number or a range such as 3-8, got {vertices!r}')
+    if not numbers_of_vertices or numbers_of_vertices[0] < 3:
+        raise argparse.ArgumentTypeError(f'polygons need at least 3 vertices, got {vertices!r}')
+
+    return numbers_of_vertices
+
+
+def get_argument_parser():
+    argument_parser = argparse.ArgumentParser(prog='polygongenerator',
+                                              description='Generate datasets of images of random polygons')
+
+    job_arguments = argument_parser.add_argument_group('job')
+    job_arguments.add_argument('--output', required=True,
+                               help='folder to save the dataset in, created if it does not exist')
+    job_arguments.add_argument('--number-of-images', type=int, required=True,
+                               help='number of images for each number of vertices')
+    job_arguments.add_argument('--sink', choices=sinks, default='folder',
+                               help='how the images are saved')
+    job_arguments.add_argument('--format', default='jpg', dest='file_format',
+                               help='file format the images are encoded as, for the folder and tar sinks')
+    job_arguments.add_argument('--image-name', default='generated_polygon',
+                               help='images are saved as {image name}_{index}.{format} by the folder sink')
+    job_arguments.add_argument('--workers', type=int, default=None,
+                               help='worker processes of the folder sink, by default one per cpu. The tar and npy '
+                                    'sinks are written by this process')
+    job_arguments.add_argument('--images-per-shard', type=int, default=None,
+                               help=f'images in each shard folder or tar file, by default the number of images over '
+                                    f'{default_number_of_shards}, up to {max_images_per_shard}')
+    job_arguments.add_argument('--batch-size', type=int, default=64,
+                               help='images drawn at once with generate_batch')
+    job_arguments.add_argument('--no-annotations', action='store_false', dest='write_annotations',
+                               help='do not write the COCO annotations.json of the folder sink')
+    job_arguments.add_argument('--seed', type=int, default=None,
+                               help='seed of the dataset, by default fresh entropy so every run is different')
+    job_arguments.add_argument('--progress-interval', type=float, default=1.0,
+                               help='fewest seconds between two progress lines')
+
+    polygon_arguments = argument_parser.add_argument_group('polygons')
+    polygon_arguments.add_argument('--type', choices=polygon_types, default='convex', dest='polygon_type')
+    polygon_arguments.add_argument('--vertices', type=parse_vertices, default=parse_vertices('5'),
+                                   help='number of vertices, or an inclusive range such as 3-8 for one dataset each')
+    polygon_arguments.add_argument('--convex-mode', choices=convex_modes, default='exact')
+    polygon_arguments.add_argument('--concave-mode', choices=concave_modes, default='angle')
+    polygon_arguments.add_argument('--reflex-vertices', type=int, default=None,
+                                   help='number of reflex vertices in the star concave mode, by default random')
+
+    image_arguments = argument_parser.add_argument_group('images')
+    image_arguments.add_argument('--image-height', type=int, default=480)
+    image_arguments.add_argument('--image-width', type=int, default=480)
+    image_arguments.add_argument('--height-bezels', type=int, default=0,
+                                 help='pixels at the top and bottom edges no vertex is drawn in')
+    image_arguments.add_argument('--width-bezels', type=int, default=0,
+                                 help='pixels at the left and right edges no vertex is drawn in')
+    image_arguments.add_argument('--background-colour', type=parse_colour, default=(255, 255, 255),
+                                 help='as b,g,r')
+    image_arguments.add_argument('--shape-colour', type=parse_colour, default=(0, 0, 0),
+                                 help='as b,g,r')
+    image_arguments.add_argument('--canvas-mode', choices=canvas_modes, default='colour')
+    image_arguments.add_argument('--rasterizer', choices=rasterizer_modes, default='anti_aliased',
+                                 dest='rasterizer_mode')
+    image_arguments.add_argument('--supersample-factor', type=int, default=4,
+                                 help='samples along each side of a pixel in the supersample rasterizer')
+
+    # encoder settings left unset are left to cv2's own defaults
+    encoder_arguments = argument_parser.add_argument_group('encoder', 'see polygon_generator/encoder.py')
+    encoder_arguments.add_argument('--jpeg-quality', type=int)
+    encoder_arguments.add_argument('--jpeg-optimize', action='store_true', default=None)
+    encoder_arguments.add_argument('--png-compression', type=int,
+                                   help='zlib level from 0 to 9')
+    encoder_arguments.add_argument('--png-strategy', choices=tuple(png_strategies))
+    encoder_arguments.add_argument('--webp-quality', type=int)
+    encoder_arguments.add_argument('--webp-lossless', action='store_true', default=None)
+    encoder_arguments.add_argument('--tiff-compression', choices=tuple(tiff_compressions))
+    encoder_arguments.add_argument('--bilevel', action='store_true',
+                                   help='save png and tiff images as black and white')
+
+    return argument_parser
+
+
+def get_image_encoder(arguments):
+    """
+    :param arguments: argparse.Namespace from get_argument_parser
+    :return: ImageEncoder with the encoder settings from the arguments
+    """
+    return ImageEncoder(jpeg_quality=arguments.jpeg_quality,
+                        jpeg_optimize=arguments.jpeg_optimize,
+                        png_compression=arguments.png_compression,
+                        png_strategy=arguments.png_strategy,
+                        webp_quality=arguments.webp_quality,
+                        webp_lossless=arguments.webp_lossless,
+                        tiff_compression=arguments.tiff_compression,
+                        bilevel=arguments.bilevel)
+
+
+def get_images_per_shard(arguments):
+    """
+    :param arguments: argparse.Namespace from get_argument_parser
+    :return: int, images_per_shard: as given, or by default from the number of images alone, so a dataset is resumed
+     with the same shards on any machine
+    """
+    if arguments.images_per_shard is not None:
+        return arguments.images_per_shard
+
+    return min(max(math.ceil(arguments.number_of_images / default_number_of_shards), 1), max_images_per_shard)
+
+
+def get_most_vertices(arguments):
+    """
+    :param arguments: argparse.Namespace from get_argument_parser
+    :return: int, most vertices the polygons can have with the type, mode and image size in the arguments, or None if
+     there is no limit
+    """
+    if arguments.polygon_type == 'convex':
+        return get_most_convex_vertices(convex_mode=arguments.convex_mode,
+                                        image_height=arguments.image_height,
+                                        image_width=arguments.image_width,
+                                        height_bezels=arguments.height_bezels,
+                                        width_bezels=arguments.width_bezels)
+    if arguments.concave_mode == 'two_opt':
+        # the vertices of a simple polygon are distinct pixels, see ConcavePolygonGenerator.untangle_polygons
+        return max(arguments.image_height - arguments.height_bezels, 0) * \
+            max(arguments.image_width - arguments.width_bezels, 0)
+
+    return None
+
+
+def get_polygon_generator(arguments,
+                          number_of_vertices: int,
+                          ):
+    """
+    :param arguments: argparse.Namespace from get_argument_parser
+    :param int, number_of_vertices:
+    :return: ConvexPolygonGenerator or ConcavePolygonGenerator with every setting from the arguments
+    """
+    if arguments.polygon_type == 'convex':
+        polygon_generator = ConvexPolygonGenerator(image_height=arguments.image_height,
+                                                   image_width=arguments.image_width,
+                                                   number_of_vertices=number_of_vertices,
+                                                   seed=arguments.seed)
+        polygon_generator.set_convex_mode(arguments.convex_mode)
+    else:
+        polygon_generator = ConcavePolygonGenerator(image_height=arguments.image_height,
+                                                    image_width=arguments.image_width,
+                                                    number_of_vertices=number_of_vertices,
+                                                    seed=arguments.seed)
+        polygon_generator.set_concave_mode(arguments.concave_mode)
+        polygon_generator.set_number_of_reflex_vertices(arguments.reflex_vertices)
+
+    polygon_generator.set_height_bezels(arguments.height_bezels)
+    polygon_generator.set_width_bezels(arguments.width_bezels)
+    polygon_generator.set_background_colour(arguments.background_colour)
+    polygon_generator.set_shape_colour(arguments.shape_colour)
+    polygon_generator.set_canvas_mode(arguments.canvas_mode)
+    polygon_generator.set_rasterizer_mode(arguments.rasterizer_mode,
+                                          supersample_factor=arguments.supersample_factor)
+
+    return polygon_generator
+
+
+class ProgressPrinter:
+    """
+    Class to print the progress of a job to a stream, at most every progress_interval seconds
+    """
+
+    def __init__(self,
+                 name: str,
+                 number_of_images: int,
+                 progress_interval: float = 1.0,
+                 stream=None,
+                 ):
+        self.name = name
+        self.number_of_images = number_of_images
+        self.progress_interval = progress_interval
+        self.stream = stream or sys.stderr
+        self.start_time = time.perf_counter()
+        self.last_print_time = None
+
+    def __call__(self,
+                 number_of_images_done: int,
+                 number_of_images: int = None,
+                 ):
+        now = time.perf_counter()
+        is_done = number_of_images_done >= self.number_of_images
+        if not is_done and self.last_print_time is not None and now - self.last_print_time < self.progress_interval:
+            return
+
+        self.last_print_time = now
+        elapsed_seconds = now - self.start_time
+        images_per_second = number_of_images_done / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        print(f'{self.name}: {number_of_images_done}/{self.number_of_images} images '
+              f'({100 * number_of_images_done / max(self.number_of_images, 1):.1f}%), {images_per_second:.0f} images/s',
+              file=self.stream, flush=True)
+
+
+def generate_packed_dataset(polygon_generator,
+                            sink,
+                            number_of_images: int,
+                            batch_size: int,
+                            progress_callback,
+                            ):
+    """
+    Generate a dataset into a tar or npy sink one batch at a time, each image from its own random generator
+
+    :return:
+    """
+    for batch_start in range(0, number_of_images, batch_size):
+        images, batch_vertices = polygon_generator.generate_batch(
+            number_of_images=min(batch_size, number_of_images - batch_start),
+            first_image_index=batch_start)
+        sink.add_batch(images=images,
+                       batch_vertices=batch_vertices)
+        progress_callback(batch_start + len(images))
+
+
+def generate_dataset(arguments,
+                     number_of_vertices: int,
+                     folder_path: str,
+                     ):
+    """
+    Generate the dataset of one number of vertices into folder_path with the sink chosen in the arguments
+
+    :return:
+    """
+    polygon_generator = get_polygon_generator(arguments=arguments,
+                                              number_of_vertices=number_of_vertices)
+    progress_printer = ProgressPrinter(name=f'vertices={number_of_vertices}',
+                                       number_of_images=arguments.number_of_images,
+                                       progress_interval=arguments.progress_interval)
+
+    if arguments.sink == 'folder':
+        DatasetGenerator(polygon_generator=polygon_generator,
+                         folder_path=folder_path,
+                         number_of_images=arguments.number_of_images,
+                         images_per_shard=get_images_per_shard(arguments),
+                         number_of_workers=arguments.workers,
+                         image_name=arguments.image_name,
+                         file_format=arguments.file_format,
+                         batch_size=arguments.batch_size,
+                         image_encoder=get_image_encoder(arguments),
+                         write_annotations=arguments.write_annotations).generate(progress_callback=progress_printer)
+        return
+
+    os.makedirs(folder_path, exist_ok=True)
+    if arguments.sink == 'tar':
+        sink = TarShardSink(folder_path=folder_path,
+                            images_per_shard=get_images_per_shard(arguments),
+                            file_format=arguments.file_format,
+                            image_encoder=get_image_encoder(arguments))
+    else:
+        sink = NpyDatasetSink(file_path=os.path.join(folder_path, 'images.npy'),
+                              number_of_images=arguments.number_of_images,
+                              image_height=arguments.image_height,
+                              image_width=arguments.image_width,
+                              number_of_channels=3 if arguments.canvas_mode == 'colour' else 1,
+                              # the 'hull' convex mode draws one more vertex than number_of_vertices
+                              max_number_of_vertices=number_of_vertices + 1)
+    with sink:
+        generate_packed_dataset(polygon_generator=polygon_generator,
+                                sink=sink,
+                                number_of_images=arguments.number_of_images,
+                                batch_size=arguments.batch_size,
+                                progress_callback=progress_printer)
+
+
+def main(argv=None):
+    """
+    :param list, argv: command line arguments, by default sys.argv[1:]
+    :return: int, exit status
+    """
+    argument_parser = get_argument_parser()
+    arguments = argument_parser.parse_args(argv)
+    try:
+        get_image_encoder(arguments)
+    except ValueError as error:
+        argument_parser.error(str(error))
+    if arguments.image_height <= arguments.height_bezels or arguments.image_width <= arguments.width_bezels:
+        argument_parser.error(f'the bezels leave no room for vertices in a {arguments.image_height} by '
+                              f'{arguments.image_width} image')
+    most_vertices = get_most_vertices(arguments)
+    if most_vertices is not None and arguments.vertices[-1] > most_vertices:
+        polygon_mode = arguments.convex_mode if arguments.polygon_type == 'convex' else arguments.concave_mode
+        argument_parser.error(f'{arguments.polygon_type} polygons in the {polygon_mode!r} mode fit at most '
+                              f'{most_vertices} vertices in a {arguments.image_height} by {arguments.image_width} '
+                              f'image, got {arguments.vertices[-1]}')
+    if arguments.reflex_vertices is not None and arguments.polygon_type == 'concave' and \
+            arguments.concave_mode == 'star':
+        for number_of_vertices in arguments.vertices:
+            most_reflex_vertices = get_most_reflex_vertices(number_of_vertices)
+            if not 0 <= arguments.reflex_vertices <= most_reflex_vertices:
+                argument_parser.error(f'a polygon with {number_of_vertices} vertices can have between 0 and '
+                                      f'{most_reflex_vertices} reflex vertices, got {arguments.reflex_vertices}')
+
+    start_time = time.perf_counter()
+    for number_of_vertices in arguments.vertices:
+        folder_path = arguments.output
+        if len(arguments.vertices) > 1:
+            folder_path = os.path.join(arguments.output, f'vertices_{number_of_vertices}')
+        generate_dataset(arguments=arguments,
+                         number_of_vertices=number_of_vertices,
+                         folder_path=folder_path)
+
+    elapsed_seconds = time.perf_counter() - start_time
+    number_of_images = arguments.number_of_images * len(arguments.vertices)
+    print(f'generated {number_of_images} images in {elapsed_seconds:.1f} s, '
+          f'{number_of_images / max(elapsed_seconds, 1e-9):.0f} images/s, saved to {arguments.output}',
+          file=sys.stderr, flush=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
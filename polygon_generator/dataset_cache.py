@@ -0,0 +1,221 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from polygon_generator.packed_dataset import NpyDatasetSink, load_npy_dataset
+
+"""
+Disk cache of generated datasets, so an experiment asking again for a dataset it has made before gets it back in the
+time it takes to map the files, instead of generating it again.
+
+A dataset is identified by a hash of the polygon generator's settings, the entropy it is seeded from and the number of
+images, and saved unencoded as memory mapped .npy arrays (see packed_dataset.NpyDatasetSink). Every image is drawn
+from its own random generator (see PolygonGenerator.get_image_random_generator), so the cached dataset is exactly the
+one generating it again would give. Once the cache is bigger than max_size_bytes, the datasets used least recently are
+deleted until it fits.
+
+Layout on disk:
+cache_folder_path/
+    3f2a...c1/  one folder per dataset, named by its key
+        images.npy
+        images_vertices.npy
+        images_vertex_counts.npy
+        cache_entry.json  settings of the dataset, its size, and when it was last used
+"""
+
+cache_version = 1
+cache_entry_file_name = 'cache_entry.json'
+images_file_name = 'images.npy'
+
+
+class DatasetCache:
+    def __init__(self,
+                 cache_folder_path: str,
+                 max_size_bytes: int = 10 * 1024 ** 3,
+                 ):
+        """
+        :param str, cache_folder_path: folder to keep the cached datasets in, created if it does not exist
+        :param int, max_size_bytes: most bytes the cached datasets can take up together, the most recently used
+         dataset is always kept even if it is bigger
+        """
+        self.cache_folder_path = cache_folder_path
+        self.max_size_bytes = max_size_bytes
+
+        os.makedirs(cache_folder_path, exist_ok=True)
+
+    def get_key(self,
+                polygon_generator,
+                number_of_images: int,
+                ):
+        """
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator the dataset is generated with
+        :param int, number_of_images:
+        :return: str, key: hex digest of everything that changes the dataset
+        """
+        key_settings = {
+            'cache_version': cache_version,
+            'settings': polygon_generator.get_settings(),
+            'entropy': polygon_generator.seed_sequence.entropy,
+            'number_of_images': number_of_images,
+        }
+        key_json = json.dumps(key_settings, sort_keys=True, default=str)
+
+        return hashlib.sha256(key_json.encode()).hexdigest()
+
+    def get_entry_path(self,
+                       key: str,
+                       ):
+        return os.path.join(self.cache_folder_path, key)
+
+    def get_dataset(self,
+                    polygon_generator,
+                    number_of_images: int,
+                    batch_size: int = 64,
+                    ):
+        """
+        Get a dataset from the cache, generating and caching it first if it is not there
+
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator with the settings and seed for the
+         dataset. With no seed it has fresh entropy, so the dataset is never found in the cache
+        :param int, number_of_images: number of images in the dataset
+        :param int, batch_size: number of images drawn at once with generate_batch when generating the dataset
+        :return: (np.memmap, np.memmap, np.memmap), (images, vertices, vertex_counts): read only, see
+         packed_dataset.load_npy_dataset
+        """
+        key = self.get_key(polygon_generator=polygon_generator,
+                           number_of_images=number_of_images)
+        entry_path = self.get_entry_path(key)
+
+        if not os.path.exists(os.path.join(entry_path, cache_entry_file_name)):
+            self.add_dataset(key=key,
+                             polygon_generator=polygon_generator,
+                             number_of_images=number_of_images,
+                             batch_size=batch_size)
+
+        self.touch(key)
+        self.evict(keep_key=key)
+
+        return load_npy_dataset(os.path.join(entry_path, images_file_name))
+
+    def add_dataset(self,
+                    key: str,
+                    polygon_generator,
+                    number_of_images: int,
+                    batch_size: int,
+                    ):
+        """
+        Generate a dataset into a temporary folder in the cache, and move it into place once it is complete, so an
+        interrupted dataset is never read back
+
+        :return: str, entry_path
+        """
+        temporary_path = tempfile.mkdtemp(dir=self.cache_folder_path, prefix='.generating_')
+        try:
+            with NpyDatasetSink(file_path=os.path.join(temporary_path, images_file_name),
+                                number_of_images=number_of_images,
+                                image_height=polygon_generator.image_height,
+                                image_width=polygon_generator.image_width,
+                                number_of_channels=3 if polygon_generator.canvas_mode == 'colour' else 1,
+                                # the 'hull' convex mode draws one more vertex than number_of_vertices
+                                max_number_of_vertices=polygon_generator.number_of_vertices + 1) as sink:
+                for batch_start in range(0, number_of_images, batch_size):
+                    images, batch_vertices = polygon_generator.generate_batch(
+                        number_of_images=min(batch_size, number_of_images - batch_start),
+                        first_image_index=batch_start)
+                    sink.add_batch(images=images,
+                                   batch_vertices=batch_vertices)
+
+            cache_entry = {
+                'key': key,
+                'settings': polygon_generator.get_settings(),
+                'entropy': polygon_generator.seed_sequence.entropy,
+                'number_of_images': number_of_images,
+                'size_bytes': get_folder_size(temporary_path),
+            }
+            with open(os.path.join(temporary_path, cache_entry_file_name), 'w') as cache_entry_file:
+                json.dump(cache_entry, cache_entry_file, indent=4, default=str)
+
+            entry_path = self.get_entry_path(key)
+            try:
+                os.replace(temporary_path, entry_path)
+            except OSError:
+                # another process cached the same dataset first
+                if not os.path.exists(os.path.join(entry_path, cache_entry_file_name)):
+                    raise
+                shutil.rmtree(temporary_path, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+            raise
+
+        return entry_path
+
+    def touch(self,
+              key: str,
+              ):
+        """
+        Mark a dataset as just used, its cache entry file's modification time is when it was last used
+
+        :param str, key:
+        :return:
+        """
+        os.utime(os.path.join(self.get_entry_path(key), cache_entry_file_name))
+
+    def get_entries(self):
+        """
+        :return: list, of (last_used, size_bytes, key) of every dataset in the cache, least recently used first
+        """
+        entries = []
+        for key in os.listdir(self.cache_folder_path):
+            cache_entry_path = os.path.join(self.get_entry_path(key), cache_entry_file_name)
+            if not os.path.exists(cache_entry_path):
+                continue
+            with open(cache_entry_path) as cache_entry_file:
+                size_bytes = json.load(cache_entry_file)['size_bytes']
+            entries.append((os.path.getmtime(cache_entry_path), size_bytes, key))
+
+        return sorted(entries)
+
+    def get_size_bytes(self):
+        return sum(size_bytes for last_used, size_bytes, key in self.get_entries())
+
+    def evict(self,
+              keep_key: str = None,
+              ):
+        """
+        Delete the datasets used least recently until the cache fits in max_size_bytes
+
+        :param str, keep_key: key of a dataset never to delete, such as the one just asked for
+        :return: list, evicted_keys
+        """
+        entries = self.get_entries()
+        size_bytes = sum(entry[1] for entry in entries)
+
+        evicted_keys = []
+        for last_used, entry_size_bytes, key in entries:
+            if size_bytes <= self.max_size_bytes:
+                break
+            if key == keep_key:
+                continue
+            shutil.rmtree(self.get_entry_path(key), ignore_errors=True)
+            size_bytes -= entry_size_bytes
+            evicted_keys.append(key)
+
+        return evicted_keys
+
+    def clear(self):
+        """
+        Delete every dataset in the cache
+
+        :return:
+        """
+        for last_used, size_bytes, key in self.get_entries():
+            shutil.rmtree(self.get_entry_path(key), ignore_errors=True)
+
+
+def get_folder_size(folder_path: str):
+    """
+    :param str, folder_path:
+    :return: int, total size in bytes of the files in the folder
+    """
+    return sum(os.path.getsize(os.path.join(folder_path, file_name)) for file_name in os.listdir(folder_path))
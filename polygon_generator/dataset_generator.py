@@ -0,0 +1,272 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from polygon_generator.image_writer import ImageWriter
+from polygon_generator.labels import CocoAnnotationWriter, annotation_file_name
+
+"""
+Generate large datasets of polygon images over a pool of processes. The images are split into shards of consecutive
+image indices, each shard is saved to its own folder by one worker, and every image is drawn from its own random
+generator (see PolygonGenerator.get_image_random_generator), so the dataset is the same no matter how many workers
+make it or in which order the shards finish.
+
+Layout on disk:
+folder_path/
+    dataset_manifest.json  settings and seed of the dataset, used to resume it
+    annotations.json  COCO labels of every image, merged from the shards' once they are all complete
+    shard_00000/
+        generated_polygon_0000000.jpg
+        ...
+        annotations.json  COCO labels of the shard's images, see labels.CocoAnnotationWriter
+        shard_complete  written once every image in the shard has been saved
+    shard_00001/
+    ...
+"""
+
+manifest_file_name = 'dataset_manifest.json'
+shard_complete_file_name = 'shard_complete'
+
+# polygon generator of the worker process, set once by initialize_worker instead of being sent with every shard
+worker_polygon_generator = None
+
+
+class DatasetGenerator:
+    def __init__(self,
+                 polygon_generator,
+                 folder_path: str,
+                 number_of_images: int,
+                 images_per_shard: int = 1000,
+                 number_of_workers: int = None,
+                 image_name: str = 'generated_polygon',
+                 file_format: str = 'jpg',
+                 batch_size: int = 64,
+                 image_encoder=None,
+                 write_annotations: bool = True,
+                 ):
+        """
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator with the settings for the dataset,
+         it is copied to every worker
+        :param str, folder_path: folder to save the dataset in, created if it does not exist
+        :param int, number_of_images: number of images in the dataset
+        :param int, images_per_shard: number of images saved in each shard folder
+        :param int, number_of_workers: number of worker processes, by default one per cpu. With 1 the dataset is made
+         in this process
+        :param str, image_name: images are saved as {image_name}_{image index}.{file_format}, with the index zero
+         padded so the files sort in order
+        :param str, file_format: file format for cv2 to save the images as
+        :param int, batch_size: number of images each worker draws at once with generate_batch
+        :param image_encoder: optional ImageEncoder with the encoder settings of the file format, by default cv2's
+        :param bool, write_annotations: write the COCO labels of the images, for each shard and for the whole dataset
+        """
+        self.polygon_generator = polygon_generator
+        self.folder_path = folder_path
+        self.number_of_images = number_of_images
+        self.images_per_shard = images_per_shard
+        self.number_of_workers = number_of_workers or os.cpu_count() or 1
+        self.image_name = image_name
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.image_encoder = image_encoder
+        self.write_annotations = write_annotations
+
+        self.number_of_shards = -(-number_of_images // images_per_shard)
+        self.index_width = len(str(max(number_of_images - 1, 0)))
+
+    def get_manifest(self):
+        """
+        :return: dict, manifest: settings of the dataset and the entropy its random generators are seeded from
+        """
+        manifest = self.polygon_generator.get_settings()
+        manifest.update({
+            'entropy': self.polygon_generator.seed_sequence.entropy,
+            'number_of_images': self.number_of_images,
+            'images_per_shard': self.images_per_shard,
+            'image_name': self.image_name,
+            'file_format': self.file_format,
+            'write_annotations': self.write_annotations,
+        })
+        if self.image_encoder is not None:
+            manifest['image_encoder'] = self.image_encoder.get_settings()
+
+        return manifest
+
+    def get_shard_path(self,
+                       shard_index: int,
+                       ):
+        return os.path.join(self.folder_path, f'shard_{shard_index:05d}')
+
+    def get_shard_size(self,
+                       shard_index: int,
+                       ):
+        first_image_index = shard_index * self.images_per_shard
+        return min(self.images_per_shard, self.number_of_images - first_image_index)
+
+    def is_shard_complete(self,
+                          shard_index: int,
+                          ):
+        return os.path.exists(os.path.join(self.get_shard_path(shard_index), shard_complete_file_name))
+
+    def load_manifest(self):
+        """
+        Resume from the manifest of a dataset already in folder_path. Raises ValueError if any setting or the seed
+        differs from the dataset's. A polygon generator made without a seed takes the dataset's entropy instead, so
+        the remaining shards continue the same dataset.
+
+        :return:
+        """
+        with open(os.path.join(self.folder_path, manifest_file_name)) as manifest_file:
+            saved_manifest = json.load(manifest_file)
+
+        manifest = self.get_manifest()
+        adopts_seed = self.polygon_generator.seed is None
+        if adopts_seed:
+            manifest['entropy'] = saved_manifest.get('entropy')
+        if manifest != saved_manifest:
+            different_settings = [key for key in manifest if manifest[key] != saved_manifest.get(key)]
+            raise ValueError(f'cannot resume the dataset in {self.folder_path}, these settings are different: '
+                             f'{different_settings}')
+
+        if adopts_seed:
+            self.polygon_generator.set_seed(saved_manifest['entropy'])
+
+    def save_manifest(self):
+        with open(os.path.join(self.folder_path, manifest_file_name), 'w') as manifest_file:
+            json.dump(self.get_manifest(), manifest_file, indent=4)
+
+    def generate(self,
+                 progress_callback=None,
+                 ):
+        """
+        Generate the dataset. If folder_path already has a manifest, the dataset is resumed: shards that were
+        completed are kept, and the others are made again from the start.
+
+        :param progress_callback: optional function called as progress_callback(number_of_images_done,
+         number_of_images) each time a shard is completed
+        :return: list, shard_paths: paths of all the shard folders, in order
+        """
+        os.makedirs(self.folder_path, exist_ok=True)
+        if os.path.exists(os.path.join(self.folder_path, manifest_file_name)):
+            self.load_manifest()
+        else:
+            self.save_manifest()
+
+        shards_to_generate = [shard_index for shard_index in range(self.number_of_shards)
+                              if not self.is_shard_complete(shard_index)]
+        number_of_images_done = sum(self.get_shard_size(shard_index) for shard_index in range(self.number_of_shards)
+                                    if shard_index not in shards_to_generate)
+
+        if self.number_of_workers == 1:
+            initialize_worker(self.polygon_generator)
+            for shard_index in shards_to_generate:
+                number_of_images_done += generate_shard(**self.get_shard_arguments(shard_index))
+                if progress_callback is not None:
+                    progress_callback(number_of_images_done, self.number_of_images)
+        else:
+            with ProcessPoolExecutor(max_workers=self.number_of_workers,
+                                     initializer=initialize_worker,
+                                     initargs=(self.polygon_generator,),
+                                     ) as executor:
+                futures = [executor.submit(generate_shard, **self.get_shard_arguments(shard_index))
+                           for shard_index in shards_to_generate]
+                for future in as_completed(futures):
+                    number_of_images_done += future.result()
+                    if progress_callback is not None:
+                        progress_callback(number_of_images_done, self.number_of_images)
+
+        if self.write_annotations:
+            self.merge_annotations()
+
+        return [self.get_shard_path(shard_index) for shard_index in range(self.number_of_shards)]
+
+    def merge_annotations(self):
+        """
+        Merge the annotation files of the shards into one for the whole dataset in folder_path, with the file names
+        of the images relative to it
+
+        :return: str, path of the merged annotation file
+        """
+        with CocoAnnotationWriter(folder_path=self.folder_path, info=self.get_manifest()) as annotation_writer:
+            for shard_index in range(self.number_of_shards):
+                shard_path = self.get_shard_path(shard_index)
+                annotation_writer.add_annotation_file(file_path=os.path.join(shard_path, annotation_file_name),
+                                                      folder_name=os.path.basename(shard_path))
+
+        return annotation_writer.file_path
+
+    def get_shard_arguments(self,
+                            shard_index: int,
+                            ):
+        first_image_index = shard_index * self.images_per_shard
+        shard_arguments = {
+            'shard_path': self.get_shard_path(shard_index),
+            'first_image_index': first_image_index,
+            'number_of_images': self.get_shard_size(shard_index),
+            'image_name': self.image_name,
+            'file_format': self.file_format,
+            'index_width': self.index_width,
+            'batch_size': self.batch_size,
+            'image_encoder': self.image_encoder,
+            'write_annotations': self.write_annotations,
+        }
+
+        return shard_arguments
+
+
+def initialize_worker(polygon_generator):
+    global worker_polygon_generator
+    worker_polygon_generator = polygon_generator
+
+
+def generate_shard(shard_path: str,
+                   first_image_index: int,
+                   number_of_images: int,
+                   image_name: str,
+                   file_format: str,
+                   index_width: int,
+                   batch_size: int,
+                   image_encoder=None,
+                   write_annotations: bool = False,
+                   ):
+    """
+    Generate and save the images of one shard with the worker's polygon generator, and their labels if
+    write_annotations, then mark the shard as complete
+
+    :return: int, number_of_images: number of images saved
+    """
+    os.makedirs(shard_path, exist_ok=True)
+
+    annotation_writer = None
+    if write_annotations:
+        annotation_writer = CocoAnnotationWriter(folder_path=shard_path, info=worker_polygon_generator.get_settings())
+
+    # each batch is a new array that is not drawn on again, so it can be written without copying
+    with ImageWriter(number_of_threads=2, image_encoder=image_encoder) as image_writer:
+        for batch_start in range(first_image_index, first_image_index + number_of_images, batch_size):
+            batch_stop = min(batch_start + batch_size, first_image_index + number_of_images)
+            images, batch_vertices = worker_polygon_generator.generate_batch(number_of_images=batch_stop - batch_start,
+                                                                             first_image_index=batch_start)
+            if annotation_writer is not None:
+                batch_labels = worker_polygon_generator.get_batch_labels(batch_vertices=batch_vertices)
+            for image_index, image in enumerate(images, start=batch_start):
+                indexed_image_name = f'{image_name}_{image_index:0{index_width}d}'
+                path_to_saved_image = image_writer.save_image_to_folder(folder_path=shard_path,
+                                                                        image_name=indexed_image_name,
+                                                                        image=image,
+                                                                        file_format=file_format,
+                                                                        copy_image=False,
+                                                                        )
+                if annotation_writer is not None:
+                    # each image has one polygon
+                    annotation_writer.add_image(file_name=os.path.basename(path_to_saved_image),
+                                                image_height=worker_polygon_generator.image_height,
+                                                image_width=worker_polygon_generator.image_width,
+                                                batch_labels=[batch_labels[image_index - batch_start]])
+
+    if annotation_writer is not None:
+        annotation_writer.close()
+
+    # only written once every image is on disk, so an interrupted shard is made again when resuming
+    with open(os.path.join(shard_path, shard_complete_file_name), 'w') as shard_complete_file:
+        shard_complete_file.write(f'{number_of_images}\n')
+
+    return number_of_images
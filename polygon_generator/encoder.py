@@ -0,0 +1,200 @@
+import os
+import cv2
+
+"""
+Encoder settings for saving images with cv2, which otherwise encodes every format with its defaults. An ImageEncoder
+keeps the tuning of each format, and is given to save_image_to_folder, ImageWriter, DatasetGenerator or TarShardSink
+to encode their images with:
+png: zlib compression level and strategy. Lossless at any level, higher levels give smaller files for more time
+jpg: quality, optimized Huffman tables and progressive encoding. Lossy, so the edges of the polygons blur
+webp: quality, or lossless
+tiff: compression scheme, lossless
+
+The images generated have only two colours apart from their anti aliased edges, so with bilevel png and tiff images are
+saved as black and white: png at 1 bit per pixel, tiff at 8 bits as cv2 cannot write 1 bit tiff. The darker of the
+two colours is saved as black and the lighter as white, whatever they are, so label canvases of 0 and 1 keep their
+polygon. Anti aliased edges are rounded to the nearer of the two, so bilevel is exact with black on white and the
+'aliased' rasterizer.
+
+benchmarks/bench_encoders.py gives the bytes and encode time per image of each format, to pick one for a storage and
+cpu budget:
+image_encoder = ImageEncoder(png_compression=1, png_strategy='rle')
+save_image_to_folder(folder_path='polygons', image_name='polygon_0', image=image, file_format='png',
+                     image_encoder=image_encoder)
+"""
+
+# zlib strategies for png, see ImageEncoder
+png_strategies = {
+    'default': cv2.IMWRITE_PNG_STRATEGY_DEFAULT,
+    'filtered': cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    'huffman_only': cv2.IMWRITE_PNG_STRATEGY_HUFFMAN_ONLY,
+    'rle': cv2.IMWRITE_PNG_STRATEGY_RLE,
+    'fixed': cv2.IMWRITE_PNG_STRATEGY_FIXED,
+}
+
+# compression schemes for tiff, as their libtiff codes
+tiff_compressions = {
+    'none': 1,
+    'lzw': 5,
+    'deflate': 8,
+    'packbits': 32773,
+}
+
+# formats that can be saved bilevel
+bilevel_file_formats = ('png', 'tiff')
+
+
+class ImageEncoder:
+    def __init__(self,
+                 jpeg_quality: int = None,
+                 jpeg_optimize: bool = None,
+                 jpeg_progressive: bool = None,
+                 png_compression: int = None,
+                 png_strategy: str = None,
+                 webp_quality: int = None,
+                 webp_lossless: bool = None,
+                 tiff_compression: str = None,
+                 bilevel: bool = False,
+                 ):
+        """
+        Every setting left as None is left out of the parameters given to cv2, which then encodes with its own default
+
+        :param int, jpeg_quality: 0 to 100
+        :param bool, jpeg_optimize: optimize the Huffman tables, a little smaller for a little more time
+        :param bool, jpeg_progressive:
+        :param int, png_compression: zlib level from 0, stored, to 9, smallest
+        :param str, png_strategy: one of png_strategies. 'rle' and 'huffman_only' are fast and do well on the large
+         flat areas of the images generated
+        :param int, webp_quality: 1 to 100, ignored if webp_lossless
+        :param bool, webp_lossless:
+        :param str, tiff_compression: one of tiff_compressions
+        :param bool, bilevel: save png and tiff images as black and white, see above
+        """
+        if jpeg_quality is not None and not 0 <= jpeg_quality <= 100:
+            raise ValueError(f'jpeg_quality must be from 0 to 100, got {jpeg_quality}')
+        if png_compression is not None and not 0 <= png_compression <= 9:
+            raise ValueError(f'png_compression must be from 0 to 9, got {png_compression}')
+        if png_strategy is not None and png_strategy not in png_strategies:
+            raise ValueError(f'png_strategy must be one of {tuple(png_strategies)}, got {png_strategy!r}')
+        if webp_quality is not None and not 1 <= webp_quality <= 100:
+            raise ValueError(f'webp_quality must be from 1 to 100, got {webp_quality}')
+        if tiff_compression is not None and tiff_compression not in tiff_compressions:
+            raise ValueError(f'tiff_compression must be one of {tuple(tiff_compressions)}, got {tiff_compression!r}')
+
+        self.jpeg_quality = jpeg_quality
+        self.jpeg_optimize = jpeg_optimize
+        self.jpeg_progressive = jpeg_progressive
+        self.png_compression = png_compression
+        self.png_strategy = png_strategy
+        self.webp_quality = webp_quality
+        self.webp_lossless = webp_lossless
+        self.tiff_compression = tiff_compression
+        self.bilevel = bilevel
+
+    def get_settings(self):
+        return {
+            'jpeg_quality': self.jpeg_quality,
+            'jpeg_optimize': self.jpeg_optimize,
+            'jpeg_progressive': self.jpeg_progressive,
+            'png_compression': self.png_compression,
+            'png_strategy': self.png_strategy,
+            'webp_quality': self.webp_quality,
+            'webp_lossless': self.webp_lossless,
+            'tiff_compression': self.tiff_compression,
+            'bilevel': self.bilevel,
+        }
+
+    def get_parameters(self,
+                       file_format: str,
+                       ):
+        """
+        :param str, file_format: file format, or file extension with or without its dot
+        :return: list, cv2.imwrite parameters for the format
+        """
+        file_format = get_file_format(file_format)
+
+        settings = {
+            'jpg': ((cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality),
+                    (cv2.IMWRITE_JPEG_OPTIMIZE, self.jpeg_optimize),
+                    (cv2.IMWRITE_JPEG_PROGRESSIVE, self.jpeg_progressive)),
+            'png': ((cv2.IMWRITE_PNG_COMPRESSION, self.png_compression),
+                    (cv2.IMWRITE_PNG_STRATEGY, png_strategies.get(self.png_strategy)),
+                    (cv2.IMWRITE_PNG_BILEVEL, self.bilevel or None)),
+            # a quality above 100 is lossless
+            'webp': ((cv2.IMWRITE_WEBP_QUALITY, 101 if self.webp_lossless else self.webp_quality),),
+            'tiff': ((cv2.IMWRITE_TIFF_COMPRESSION, tiff_compressions.get(self.tiff_compression)),),
+        }.get(file_format, ())
+
+        # settings left as None are left to cv2
+        parameters = []
+        for parameter, setting in settings:
+            if setting is not None:
+                parameters += [parameter, int(setting)]
+
+        return parameters
+
+    def prepare_image(self,
+                      image,
+                      file_format: str,
+                      ):
+        """
+        :param image: np.ndarray, uint8 image with 1 or 3 channels
+        :param str, file_format:
+        :return: np.ndarray, the image as it is encoded: for bilevel png and tiff a single channel image of 0 and 255,
+         with the pixels above the middle of the image's range of values as 255, so label canvases of 0 and 1 and
+         images of any two colours keep both
+        """
+        if not self.bilevel or get_file_format(file_format) not in bilevel_file_formats:
+            return image
+
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        lowest_value, highest_value = cv2.minMaxLoc(image)[:2]
+        # an image of a single value is kept black or white
+        middle_value = (lowest_value + highest_value) / 2 if highest_value > lowest_value else 127
+        threshold, bilevel_image = cv2.threshold(image, middle_value, 255, cv2.THRESH_BINARY)
+
+        return bilevel_image
+
+    def encode(self,
+               image,
+               file_format: str,
+               ):
+        """
+        :param image: np.ndarray image to encode
+        :param str, file_format:
+        :return: np.ndarray, encoded_image: uint8 bytes of the encoded file
+        """
+        file_format = get_file_format(file_format)
+        was_encoded, encoded_image = cv2.imencode(f'.{file_format}',
+                                                  self.prepare_image(image, file_format),
+                                                  self.get_parameters(file_format))
+        if not was_encoded:
+            raise ValueError(f'could not encode image as {file_format}')
+
+        return encoded_image
+
+    def write(self,
+              path_to_save_image: str,
+              image,
+              ):
+        """
+        :param str, path_to_save_image: path to save the image to, its extension decides the file format
+        :param image: np.ndarray image to save
+        :return: bool, was_written, as cv2.imwrite
+        """
+        file_format = os.path.splitext(path_to_save_image)[1]
+
+        return cv2.imwrite(path_to_save_image,
+                           self.prepare_image(image, file_format),
+                           self.get_parameters(file_format))
+
+
+def get_file_format(file_format: str):
+    """
+    :param str, file_format: file format, or file extension with or without its dot, in any case
+    :return: str, file_format: lower case, with 'jpeg' as 'jpg' and 'tif' as 'tiff'
+    """
+    file_format = file_format.lower().lstrip('.')
+
+    return {'jpeg': 'jpg', 'tif': 'tiff'}.get(file_format, file_format)
@@ -1,8 +1,11 @@
 import os
+import time
 import shutil
+import itertools
 import cv2
-import tkinter
-from tkinter import messagebox
+
+# what Folder does when its folder already exists on disk, see Folder.__init__
+collision_policies = ('suffix', 'overwrite', 'fail')
 
 
 class Folder:
@@ -14,45 +17,45 @@ class Folder:
     def __init__(self,
                  folder_name: str,
                  folder_path: str,
+                 collision_policy: str = 'suffix',
                  ):
         """
         A folder can have files and folders in it, but for now just care about it containing folders. The name of the
         folder should be the same as the last part of the folder path.
 
+        If the folder already exists, collision_policy decides what happens, without ever asking:
+        'suffix': create a new folder with "_copy_(#)" appended to the end of the name, using the first free number
+        'overwrite': use the existing folder, files saved with the same name as ones already there replace them
+        'fail': raise the FileExistsError
+
         :param str, folder_path: path to save the folder on disk
         :param str, folder_name: Should be the same as the last part of the folder path
+        :param str, collision_policy: one of collision_policies
         """
+        if collision_policy not in collision_policies:
+            raise ValueError(f'collision_policy must be one of {collision_policies}, got {collision_policy!r}')
+
         self.name = folder_name
         self.path = folder_path
         self.children = set()
 
         try:
             self.save_to_disk()
-        except FileExistsError as error:
-            root = tkinter.Tk()
-            yes_or_no_result = tkinter.messagebox.askyesno(
-                'Folder manager',
-                'File or folder already exists. Would you like to create one with "_copy_(#)" appended to the '
-                'end of the file name?')
-            if yes_or_no_result is True:
-                # rename the file something else
-                for i in range(20):  # randomly put 20 here, just assuming there won't already be more
+        except FileExistsError:
+            if collision_policy == 'fail':
+                raise
+            if collision_policy == 'suffix':
+                # rename the folder something else
+                old_name = self.get_name()
+                old_path = self.get_path()
+                for i in itertools.count():
                     try:
-                        old_name = self.get_name()
-                        old_path = self.get_path()
-                        new_name = old_name + f'_copy_({i})'
-                        new_path = old_path + f'_copy_({i})'
-                        self.set_name(name=new_name)
-                        self.set_path(path=new_path)
+                        self.set_name(name=old_name + f'_copy_({i})')
+                        self.set_path(path=old_path + f'_copy_({i})')
                         self.save_to_disk()
-                        root.destroy()
                         break
-                    except FileExistsError as error:
-                        self.set_name(name=old_name)
-                        self.set_path(path=old_path)
+                    except FileExistsError:
                         pass
-            else:
-                raise error
 
     def get_name(self):
         return self.name
@@ -92,17 +95,39 @@ class Folder:
     def save_image_to_folder(self,
                              image_name: str,
                              image,
+                             image_writer=None,
+                             stats=None,
+                             image_encoder=None,
                              ):
         """
         Save an image to disk using cv2
         :param str, image_name: name of the file to save the image as in the folder
         :param image: image to save
+        :param image_writer: optional ImageWriter to queue the image with instead of saving it before returning
+        :param stats: optional GeneratorStats to record the write in, when there is no image_writer
+        :param image_encoder: optional ImageEncoder to encode the image with, when there is no image_writer, an
+         ImageWriter encodes with its own
 
         :return: str, path_to_save_image: the path the image was saved to
         """
+        if image_writer is not None:
+            return image_writer.save_image_to_folder(folder_path=self.path,
+                                                     image_name=image_name,
+                                                     image=image,
+                                                     )
+
+        if stats is not None:
+            start_time = time.perf_counter()
+
         image_name = f'{image_name}.jpg'
         path_to_save_image = os.path.join(self.path, image_name)
-        cv2.imwrite(path_to_save_image, image)
+        if image_encoder is not None:
+            image_encoder.write(path_to_save_image, image)
+        else:
+            cv2.imwrite(path_to_save_image, image)
+
+        if stats is not None:
+            stats.record_image_written(path_to_save_image, start_time)
 
         return path_to_save_image
 
@@ -111,6 +136,9 @@ def save_image_to_folder(folder_path: str,
                          image_name: str,
                          image,
                          file_format: str = 'jpg',
+                         image_writer=None,
+                         stats=None,
+                         image_encoder=None,
                          ):
     """
     Save an image to disk using cv2
@@ -118,11 +146,32 @@ def save_image_to_folder(folder_path: str,
     :param str, image_name: name of the file to save the image as in the folder
     :param image: image to save
     :param str, file_format:
+    :param image_writer: optional ImageWriter to queue the image with instead of saving it before returning
+    :param stats: optional GeneratorStats to record the write in, when there is no image_writer, an ImageWriter
+     records in its own stats
+    :param image_encoder: optional ImageEncoder to encode the image with, when there is no image_writer, an
+     ImageWriter encodes with its own
 
     :return: str, path_to_save_image: the path the image was saved to
     """
+    if image_writer is not None:
+        return image_writer.save_image_to_folder(folder_path=folder_path,
+                                                 image_name=image_name,
+                                                 image=image,
+                                                 file_format=file_format,
+                                                 )
+
+    if stats is not None:
+        start_time = time.perf_counter()
+
     image_name = f'{image_name}.{file_format}'
     path_to_save_image = os.path.join(folder_path, image_name)
-    cv2.imwrite(path_to_save_image, image)
+    if image_encoder is not None:
+        image_encoder.write(path_to_save_image, image)
+    else:
+        cv2.imwrite(path_to_save_image, image)
+
+    if stats is not None:
+        stats.record_image_written(path_to_save_image, start_time)
 
     return path_to_save_image
@@ -0,0 +1,202 @@
+import os
+import time
+import threading
+
+"""
+Opt in timing instrumentation for the polygon generators. A generator only records anything once
+PolygonGenerator.enable_stats has been called, until then each stage costs a single check that stats is None.
+
+Stages timed:
+reset: filling canvases with the background colour
+sampling: drawing the random vertices
+construction: building the polygon from the vertices, for example the convex hull and its retries
+rasterization: drawing the polygon onto the canvas
+encoding: encoding and writing an image to disk, when the stats are passed to save_image_to_folder or an ImageWriter
+
+Counters:
+images_generated, hull_retries, exact_retries, images_written, bytes_written
+"""
+
+# number of histogram buckets, bucket b counts stage times from 2 ** (b - 1) up to 2 ** b microseconds
+number_of_histogram_buckets = 32
+
+
+class StageTimings:
+    """
+    Class to keep the count, total, fastest and slowest time and a log2 histogram of the times a stage has taken
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.min_seconds = float('inf')
+        self.max_seconds = 0.0
+        self.histogram = [0] * number_of_histogram_buckets
+
+    def add(self,
+            seconds: float,
+            ):
+        self.count += 1
+        self.total_seconds += seconds
+        self.min_seconds = min(self.min_seconds, seconds)
+        self.max_seconds = max(self.max_seconds, seconds)
+        bucket = min(int(seconds * 1e6).bit_length(), number_of_histogram_buckets - 1)
+        self.histogram[bucket] += 1
+
+    def get_percentile_seconds(self,
+                               percentile: float,
+                               ):
+        """
+        :param float, percentile: between 0 and 100
+        :return: float, upper edge of the histogram bucket the percentile falls in, in seconds
+        """
+        if self.count == 0:
+            return 0.0
+        needed_count = percentile / 100 * self.count
+        running_count = 0
+        for bucket, bucket_count in enumerate(self.histogram):
+            running_count += bucket_count
+            if running_count >= needed_count:
+                return 2 ** bucket / 1e6
+        return self.max_seconds
+
+    def get_summary(self):
+        summary = {
+            'count': self.count,
+            'total_seconds': self.total_seconds,
+            'mean_seconds': self.total_seconds / self.count if self.count else 0.0,
+            'min_seconds': self.min_seconds if self.count else 0.0,
+            'max_seconds': self.max_seconds,
+            'p50_seconds': self.get_percentile_seconds(50),
+            'p99_seconds': self.get_percentile_seconds(99),
+            'histogram_microseconds_log2': list(self.histogram),
+        }
+
+        return summary
+
+
+class GeneratorStats:
+    """
+    Class to collect per stage timings and counters from a polygon generator, and optionally report them every
+    report_interval seconds
+    """
+
+    def __init__(self,
+                 report_callback=None,
+                 report_interval: float = 10.0,
+                 ):
+        """
+        :param report_callback: optional function called as report_callback(stats) at most every report_interval
+         seconds, as images are generated or written. It is called on whichever thread recorded the image
+        :param float, report_interval: seconds between reports
+        """
+        self.report_callback = report_callback
+        self.report_interval = report_interval
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {
+                'images_generated': 0,
+                'hull_retries': 0,
+                'exact_retries': 0,
+                'images_written': 0,
+                'bytes_written': 0,
+            }
+            self.start_time = time.perf_counter()
+            self.last_report_time = self.start_time
+
+    def record_time(self,
+                    stage: str,
+                    start_time: float,
+                    ):
+        """
+        Record the time a stage took from start_time until now
+
+        :param str, stage: name of the stage
+        :param float, start_time: time.perf_counter() when the stage started
+        :return: float, end_time: time.perf_counter() now, to use as the start_time of the next stage
+        """
+        end_time = time.perf_counter()
+        with self.lock:
+            if stage not in self.stages:
+                self.stages[stage] = StageTimings()
+            self.stages[stage].add(end_time - start_time)
+
+        return end_time
+
+    def increment(self,
+                  counter: str,
+                  amount: int = 1,
+                  ):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+        if counter in ('images_generated', 'images_written'):
+            self.report_if_due()
+
+    def record_image_written(self,
+                             path_to_saved_image: str,
+                             start_time: float,
+                             ):
+        """
+        Record the encoding stage of an image written to disk from start_time until now, and count it and its bytes
+
+        :param str, path_to_saved_image: path the image was written to
+        :param float, start_time: time.perf_counter() when encoding started
+        :return:
+        """
+        self.record_time('encoding', start_time)
+        if os.path.exists(path_to_saved_image):
+            self.increment('bytes_written', os.path.getsize(path_to_saved_image))
+        self.increment('images_written')
+
+    def report_if_due(self):
+        if self.report_callback is None:
+            return
+
+        now = time.perf_counter()
+        with self.lock:
+            if now - self.last_report_time < self.report_interval:
+                return
+            self.last_report_time = now
+        self.report_callback(self)
+
+    def get_elapsed_seconds(self):
+        return time.perf_counter() - self.start_time
+
+    def get_images_per_second(self):
+        """
+        :return: float, images generated per second since the stats were enabled or reset
+        """
+        elapsed_seconds = self.get_elapsed_seconds()
+        if elapsed_seconds <= 0:
+            return 0.0
+
+        return self.counters['images_generated'] / elapsed_seconds
+
+    def get_summary(self):
+        """
+        :return: dict, summary: json serializable summary of every stage and counter
+        """
+        with self.lock:
+            summary = {
+                'elapsed_seconds': self.get_elapsed_seconds(),
+                'images_per_second': self.get_images_per_second(),
+                'counters': dict(self.counters),
+                'stages': {stage: stage_timings.get_summary() for stage, stage_timings in self.stages.items()},
+            }
+
+        return summary
+
+    def __str__(self):
+        summary = self.get_summary()
+        lines = [f'{summary["images_per_second"]:.1f} images/s over {summary["elapsed_seconds"]:.1f} s, '
+                 + ', '.join(f'{counter}={value}' for counter, value in summary['counters'].items())]
+        for stage, stage_summary in summary['stages'].items():
+            lines.append(f'  {stage:<14} mean {stage_summary["mean_seconds"] * 1e6:>10.1f} us  '
+                         f'p99 <= {stage_summary["p99_seconds"] * 1e6:>10.0f} us  count {stage_summary["count"]}')
+
+        return '\n'.join(lines)
@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import cv2
+
+
+class ImageWriter:
+    """
+    Class to encode and save images on a pool of background threads, so that the next polygon can be drawn while the
+    last ones are written to disk. cv2 releases the GIL while it encodes, so the threads run alongside the drawing.
+
+    At most max_pending_images images wait to be written at once; saving another blocks until one is done. An error
+    writing an image is raised from the next call to save_image_to_folder, flush or close.
+
+    Use it as a context manager so that every image is written when the block ends:
+    with ImageWriter() as image_writer:
+        for index in range(n):
+            image_writer.save_image_to_folder(folder_path=folder_path,
+                                              image_name=f'polygon_{index}',
+                                              image=polygon_generator.generate_polygon())
+    """
+
+    def __init__(self,
+                 number_of_threads: int = 4,
+                 max_pending_images: int = None,
+                 stats=None,
+                 image_encoder=None,
+                 ):
+        """
+        :param int, number_of_threads: number of threads encoding and writing images
+        :param int, max_pending_images: most images that can wait to be written at once, by default four per thread
+        :param stats: optional GeneratorStats to record the encoding time and bytes of each image written in, for
+         example the one returned by PolygonGenerator.enable_stats
+        :param image_encoder: optional ImageEncoder with the encoder settings of each file format, by default cv2's
+        """
+        if max_pending_images is None:
+            max_pending_images = 4 * number_of_threads
+
+        self.executor = ThreadPoolExecutor(max_workers=number_of_threads,
+                                           thread_name_prefix='image_writer')
+        self.pending_image_slots = threading.BoundedSemaphore(max_pending_images)
+        self.pending_writes = set()
+        self.errors = []
+        self.lock = threading.Lock()
+        self.closed = False
+        self.stats = stats
+        self.image_encoder = image_encoder
+
+    def save_image_to_folder(self,
+                             folder_path: str,
+                             image_name: str,
+                             image,
+                             file_format: str = 'jpg',
+                             copy_image: bool = True,
+                             ):
+        """
+        Queue an image to be saved to disk using cv2, blocking while max_pending_images are already waiting
+
+        :param str, folder_path: folder to save the image to
+        :param str, image_name: name of the file to save the image as in the folder
+        :param image: image to save
+        :param str, file_format:
+        :param bool, copy_image: copy the image before queueing it. Only turn this off if the image will not be
+         changed until it has been written, for example if it is not drawn on again before flush
+
+        :return: str, path_to_save_image: the path the image will be saved to
+        """
+        self.raise_error()
+        if self.closed:
+            raise ValueError('cannot save an image with a closed ImageWriter')
+
+        if copy_image:
+            image = image.copy()
+        path_to_save_image = os.path.join(folder_path, f'{image_name}.{file_format}')
+
+        self.pending_image_slots.acquire()
+        write = self.executor.submit(write_image, path_to_save_image, image, self.stats, self.image_encoder)
+        with self.lock:
+            self.pending_writes.add(write)
+        write.add_done_callback(self.image_written)
+
+        return path_to_save_image
+
+    def image_written(self,
+                      write,
+                      ):
+        with self.lock:
+            self.pending_writes.discard(write)
+            if write.exception() is not None:
+                self.errors.append(write.exception())
+        self.pending_image_slots.release()
+
+    def raise_error(self):
+        """
+        Raise the first error from writing an image, if there has been one since the last was raised
+
+        :return:
+        """
+        with self.lock:
+            if not self.errors:
+                return
+            error = self.errors.pop(0)
+        raise error
+
+    def flush(self):
+        """
+        Wait until every queued image has been written
+
+        :return:
+        """
+        with self.lock:
+            pending_writes = list(self.pending_writes)
+        wait(pending_writes)
+        self.raise_error()
+
+    def close(self):
+        """
+        Write every queued image, then stop the threads
+
+        :return:
+        """
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # do not hide the error from the with block behind one from writing
+            self.closed = True
+            self.executor.shutdown(wait=True)
+
+
+def write_image(path_to_save_image: str,
+                image,
+                stats=None,
+                image_encoder=None,
+                ):
+    """
+    Save an image to disk using cv2, raising an error if it could not be written
+
+    :param str, path_to_save_image:
+    :param image: image to save
+    :param stats: optional GeneratorStats to record the write in
+    :param image_encoder: optional ImageEncoder to encode the image with
+    :return:
+    """
+    if stats is not None:
+        start_time = time.perf_counter()
+
+    if image_encoder is not None:
+        was_written = image_encoder.write(path_to_save_image, image)
+    else:
+        was_written = cv2.imwrite(path_to_save_image, image)
+    if not was_written:
+        raise OSError(f'could not write image to {path_to_save_image}')
+
+    if stats is not None:
+        stats.record_image_written(path_to_save_image, start_time)
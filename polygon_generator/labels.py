@@ -0,0 +1,247 @@
+import os
+import json
+import shutil
+import numpy as np
+import cv2
+
+"""
+Ground truth labels of the polygons drawn, worked out from the vertices the generator drew with, so the images never
+have to be read back. The labels of a polygon are its vertices, bounding box, area, whether it is convex and optionally
+its instance mask. The mask is drawn from the vertices on its own canvas after the image, aliased, so it has every pixel
+whose centre is inside the polygon whichever rasterizer drew the image.
+
+CocoAnnotationWriter streams the labels of a whole dataset into one COCO style json file next to the images, writing
+each image as it is added rather than keeping the dataset in memory:
+with CocoAnnotationWriter(folder_path=folder.get_path()) as annotation_writer:
+    for index in range(n):
+        image = polygon_generator.generate_polygon()
+        path_to_saved_image = folder.save_image_to_folder(image_name=f'polygon_{index}', image=image)
+        annotation_writer.add_image(file_name=os.path.basename(path_to_saved_image),
+                                    image_height=polygon_generator.image_height,
+                                    image_width=polygon_generator.image_width,
+                                    batch_labels=[polygon_generator.get_labels()])
+"""
+
+annotation_file_name = 'annotations.json'
+default_categories = [{'id': 1, 'name': 'polygon'}]
+
+
+def get_polygon_area(polygon_vertices):
+    """
+    :param polygon_vertices: np.ndarray of the vertices in order around the polygon, with shape (n, 1, 2) or (n, 2)
+    :return: float, area enclosed by the vertices, by the shoelace formula
+    """
+    x, y = np.asarray(polygon_vertices, np.float64).reshape((-1, 2)).T
+
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+def get_is_convex(polygon_vertices):
+    """
+    :param polygon_vertices: np.ndarray of the vertices in order around the polygon, with shape (n, 1, 2) or (n, 2)
+    :return: bool, the polygon turns the same way at every vertex, ignoring collinear vertices
+    """
+    polygon_vertices = np.asarray(polygon_vertices).reshape((-1, 2))
+    # whole pixel vertices are checked exactly, the float vertices of a sub pixel scene in float64
+    polygon_vertices = polygon_vertices.astype(np.int64 if np.issubdtype(polygon_vertices.dtype, np.integer)
+                                               else np.float64)
+    edges = np.roll(polygon_vertices, -1, axis=0) - polygon_vertices
+    next_edges = np.roll(edges, -1, axis=0)
+    # z component of the cross product of each edge with the next, written out as np.cross of 2d vectors is deprecated
+    turns = edges[:, 0] * next_edges[:, 1] - edges[:, 1] * next_edges[:, 0]
+
+    return bool((turns >= 0).all() or (turns <= 0).all())
+
+
+def get_polygon_labels(polygon_vertices,
+                       image_height: int = None,
+                       image_width: int = None,
+                       include_mask: bool = False,
+                       ):
+    """
+    :param polygon_vertices: np.ndarray of the vertices in order around the polygon, with shape (n, 1, 2) or (n, 2)
+    :param int, image_height: height of the image, only needed for the mask
+    :param int, image_width: width of the image, only needed for the mask
+    :param bool, include_mask: also draw the polygon's instance mask
+    :return: dict, labels: 'vertices' as a list of [x, y], 'bbox' as [x, y, width, height] of the pixels the vertices
+     are in, 'area' enclosed by the vertices, 'is_convex', and 'mask' as a bool np.ndarray of the image's shape if
+     include_mask
+    """
+    polygon_vertices = np.asarray(polygon_vertices).reshape((-1, 2))
+    # pixel k covers from k - 0.5 to k + 0.5, so float vertices are in the pixel they round to
+    x_min, y_min = np.round(polygon_vertices.min(axis=0)).astype(int)
+    x_max, y_max = np.round(polygon_vertices.max(axis=0)).astype(int)
+
+    labels = {
+        'vertices': polygon_vertices.tolist(),
+        'bbox': [int(x_min), int(y_min), int(x_max - x_min + 1), int(y_max - y_min + 1)],
+        'area': get_polygon_area(polygon_vertices),
+        'is_convex': get_is_convex(polygon_vertices),
+    }
+    if include_mask:
+        mask = np.zeros((image_height, image_width), np.uint8)
+        cv2.fillPoly(img=mask,
+                     pts=[np.round(polygon_vertices).astype(np.int32)],
+                     color=1,
+                     lineType=cv2.LINE_8,
+                     )
+        labels['mask'] = mask.view(bool)
+
+    return labels
+
+
+def get_batch_labels(batch_vertices,
+                     image_height: int = None,
+                     image_width: int = None,
+                     include_masks: bool = False,
+                     occlusion: bool = False,
+                     ):
+    """
+    :param batch_vertices: list of np.ndarray of each polygon's vertices, for example from generate_batch or
+     SceneGenerator.generate_scene
+    :param int, image_height: height of the images, only needed for the masks
+    :param int, image_width: width of the images, only needed for the masks
+    :param bool, include_masks: also draw each polygon's instance mask
+    :param bool, occlusion: the polygons are drawn in order onto the same image, as in a scene, so each mask is cut
+     down to what is left visible by the polygons drawn after it
+    :return: list, of the labels of each polygon, see get_polygon_labels
+    """
+    batch_labels = [get_polygon_labels(polygon_vertices=polygon_vertices,
+                                       image_height=image_height,
+                                       image_width=image_width,
+                                       include_mask=include_masks)
+                    for polygon_vertices in batch_vertices]
+
+    if include_masks and occlusion:
+        covered = np.zeros((image_height, image_width), bool)
+        for labels in reversed(batch_labels):
+            visible_mask = labels['mask'] & ~covered
+            covered |= labels['mask']
+            labels['mask'] = visible_mask
+
+    return batch_labels
+
+
+class CocoAnnotationWriter:
+    def __init__(self,
+                 folder_path: str,
+                 file_name: str = annotation_file_name,
+                 categories: list = None,
+                 info: dict = None,
+                 ):
+        """
+        The images are written to the file as they are added, and the annotations to a temporary file beside it that
+        is copied in on close, so memory use does not grow with the dataset
+
+        :param str, folder_path: folder to save the annotation file in, usually the folder of the images
+        :param str, file_name: name of the annotation file
+        :param list, categories: COCO categories, as dicts with an 'id' and 'name', by default one 'polygon' category
+        :param dict, info: optional COCO info, for example the polygon generator's settings
+        """
+        if categories is None:
+            categories = default_categories
+
+        self.file_path = os.path.join(folder_path, file_name)
+        self.annotations_file_path = f'{self.file_path}.annotations.tmp'
+        self.categories = categories
+        self.number_of_images = 0
+        self.number_of_annotations = 0
+
+        self.file = open(self.file_path, 'w')
+        self.annotations_file = open(self.annotations_file_path, 'w+')
+        self.file.write('{"info": ' + json.dumps(info or {}) + ', "images": [')
+
+    def add_image(self,
+                  file_name: str,
+                  image_height: int,
+                  image_width: int,
+                  batch_labels: list,
+                  category_id: int = None,
+                  ):
+        """
+        :param str, file_name: file name of the image, relative to the annotation file
+        :param int, image_height:
+        :param int, image_width:
+        :param list, batch_labels: labels of each polygon in the image, see get_polygon_labels
+        :param int, category_id: category of the polygons, by default the first category
+        :return: int, image_id
+        """
+        if category_id is None:
+            category_id = self.categories[0]['id']
+
+        image_id = self.number_of_images
+        image_entry = {
+            'id': image_id,
+            'file_name': file_name,
+            'height': image_height,
+            'width': image_width,
+        }
+        self.file.write((', ' if image_id else '') + json.dumps(image_entry))
+        self.number_of_images += 1
+
+        for labels in batch_labels:
+            annotation = {
+                'id': self.number_of_annotations,
+                'image_id': image_id,
+                'category_id': category_id,
+                'segmentation': [np.reshape(labels['vertices'], -1).tolist()],
+                'area': labels['area'],
+                'bbox': labels['bbox'],
+                'iscrowd': 0,
+                'is_convex': labels['is_convex'],
+                'number_of_vertices': len(labels['vertices']),
+            }
+            self.annotations_file.write((', ' if self.number_of_annotations else '') + json.dumps(annotation))
+            self.number_of_annotations += 1
+
+        return image_id
+
+    def add_annotation_file(self,
+                            file_path: str,
+                            folder_name: str = '',
+                            ):
+        """
+        Add every image and annotation of another annotation file, such as the file of one shard of a dataset, with
+        their ids numbered on from the images and annotations already added
+
+        :param str, file_path: path of the COCO json file to add, with the same categories
+        :param str, folder_name: folder of the other file's images relative to this file, joined to their file names
+        :return:
+        """
+        with open(file_path) as annotation_file:
+            added_annotations = json.load(annotation_file)
+
+        image_ids = {}
+        for image_entry in added_annotations['images']:
+            image_ids[image_entry['id']] = self.number_of_images
+            image_entry = dict(image_entry,
+                               id=self.number_of_images,
+                               file_name=os.path.join(folder_name, image_entry['file_name']).replace(os.sep, '/'))
+            self.file.write((', ' if self.number_of_images else '') + json.dumps(image_entry))
+            self.number_of_images += 1
+
+        for annotation in added_annotations['annotations']:
+            annotation = dict(annotation,
+                              id=self.number_of_annotations,
+                              image_id=image_ids[annotation['image_id']])
+            self.annotations_file.write((', ' if self.number_of_annotations else '') + json.dumps(annotation))
+            self.number_of_annotations += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        self.file.write('], "annotations": [')
+        self.annotations_file.seek(0)
+        shutil.copyfileobj(self.annotations_file, self.file)
+        self.file.write('], "categories": ' + json.dumps(self.categories) + '}')
+
+        self.file.close()
+        self.annotations_file.close()
+        os.remove(self.annotations_file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from polygon_generator.polygon_geometry import PolygonGeometry, load_polygon_geometry
+
+"""
+Dataset that keeps only the polygons' vertices on disk, and draws each image when it is read. For a large dataset this
+trades a cheap fill for storage and I/O: a polygon with n vertices takes 8 * n bytes plus an 8 byte offset, against a
+few kilobytes for even a small jpg.
+
+The images are drawn with the size, colours and rasterizer of a polygon generator, and the images drawn most recently
+are kept in a least recently used cache, so reading the same images again in an epoch does not draw them again:
+polygon_generator.generate_geometry(number_of_polygons=1000000).save('polygons.npy')
+lazy_dataset = LazyPolygonDataset(geometry='polygons.npy', polygon_generator=polygon_generator)
+image, polygon_vertices = lazy_dataset[123]
+"""
+
+
+class LazyPolygonDataset:
+    def __init__(self,
+                 geometry,
+                 polygon_generator,
+                 cache_size: int = 256,
+                 ):
+        """
+        :param geometry: PolygonGeometry, or the path of one saved with PolygonGeometry.save, which is memory mapped
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator whose image size, colours and
+         rasterizer the images are drawn with. Changing its settings changes images drawn after, so clear_cache too
+        :param int, cache_size: number of drawn images to keep, 0 to draw every image each time it is read
+        """
+        if not isinstance(geometry, PolygonGeometry):
+            geometry = load_polygon_geometry(geometry)
+
+        self.geometry = geometry
+        self.polygon_generator = polygon_generator
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __len__(self):
+        return len(self.geometry)
+
+    def draw_image(self,
+                   image_index: int,
+                   image=None,
+                   ):
+        """
+        Draw an image from its polygon's vertices, without the cache
+
+        :param int, image_index:
+        :param image: optional np.ndarray to draw into, with shape PolygonGenerator.get_image_shape(), by default a new
+         one
+        :return: np.ndarray, image
+        """
+        polygon_generator = self.polygon_generator
+        if image is None:
+            image = polygon_generator.get_background_template().copy()
+        else:
+            image[:] = polygon_generator.get_background_template()
+
+        polygon_generator.rasterizer.fill_polygon(image=image,
+                                                  polygon_vertices=self.geometry[image_index],
+                                                  colour=polygon_generator.get_canvas_colour(
+                                                      polygon_generator.shape_colour),
+                                                  is_convex=polygon_generator.polygons_are_convex)
+
+        return image
+
+    def get_image(self,
+                  image_index: int,
+                  ):
+        """
+        :param int, image_index:
+        :return: np.ndarray, image: read only, as it is shared with the cache, copy it to draw on it
+        """
+        image = self.cache.get(image_index)
+        if image is not None:
+            self.cache.move_to_end(image_index)
+            self.cache_hits += 1
+            return image
+
+        self.cache_misses += 1
+        image = self.draw_image(image_index)
+        if self.cache_size > 0:
+            image.flags.writeable = False
+            self.cache[image_index] = image
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return image
+
+    def get_images(self,
+                   image_indices,
+                   images=None,
+                   ):
+        """
+        Draw a batch of images into one contiguous array, for example for a training batch. Cached images are copied
+        in, the others are drawn straight into the batch and not cached.
+
+        :param image_indices: indices of the images
+        :param images: optional np.ndarray to draw the batch into, see PolygonGenerator.reset_batch
+        :return: np.ndarray, images: with shape (len(image_indices),) + PolygonGenerator.get_image_shape()
+        """
+        polygon_generator = self.polygon_generator
+        images = polygon_generator.reset_batch(number_of_images=len(image_indices),
+                                               images=images)
+        shape_colour = polygon_generator.get_canvas_colour(polygon_generator.shape_colour)
+        for image, image_index in zip(images, image_indices):
+            cached_image = self.cache.get(image_index)
+            if cached_image is not None:
+                self.cache.move_to_end(image_index)
+                self.cache_hits += 1
+                image[:] = cached_image
+            else:
+                self.cache_misses += 1
+                polygon_generator.rasterizer.fill_polygon(image=image,
+                                                          polygon_vertices=self.geometry[image_index],
+                                                          colour=shape_colour,
+                                                          is_convex=polygon_generator.polygons_are_convex)
+
+        return images
+
+    def get_vertices(self,
+                     image_index: int,
+                     ):
+        """
+        :param int, image_index:
+        :return: np.ndarray, vertices of the image's polygon with shape (n, 1, 2)
+        """
+        return self.geometry[image_index]
+
+    def __getitem__(self,
+                    image_index: int,
+                    ):
+        return self.get_image(image_index), self.get_vertices(image_index)
+
+    def clear_cache(self):
+        self.cache.clear()
@@ -0,0 +1,348 @@
+import os
+import io
+import json
+import mmap
+import tarfile
+import cv2
+import numpy as np
+
+"""
+Packed dataset formats, to save a large dataset as a few large files instead of one small file per image.
+
+NpyDatasetSink saves the images into one memory mapped .npy array with shape (N, height, width, channels), with the
+polygon vertices in sidecar .npy arrays. load_npy_dataset maps them back without reading them into memory, so slicing
+them is zero copy.
+
+TarShardSink saves the images encoded (for example as png) into tar files of images_per_shard images each, with an
+index.jsonl file giving the shard, position and vertices of every image. TarShardDataset reads an encoded image as a
+slice of the memory mapped tar file, without copying it.
+
+Both sinks are written to incrementally, one image or one batch at a time:
+with NpyDatasetSink(file_path='polygons.npy', number_of_images=n, image_height=h, image_width=w) as sink:
+    for batch_start in range(0, n, 64):
+        images, batch_vertices = polygon_generator.generate_batch(number_of_images=min(64, n - batch_start))
+        sink.add_batch(images=images, batch_vertices=batch_vertices)
+"""
+
+tar_shard_index_file_name = 'index.jsonl'
+
+
+class NpyDatasetSink:
+    def __init__(self,
+                 file_path: str,
+                 number_of_images: int,
+                 image_height: int,
+                 image_width: int,
+                 number_of_channels: int = 3,
+                 max_number_of_vertices: int = 100,
+                 ):
+        """
+        Images are saved to file_path, and the vertices of each polygon to {file_path stem}_vertices.npy, with shape
+        (N, max_number_of_vertices, 2) and padded with zeros, and the number of vertices of each polygon to
+        {file_path stem}_vertex_counts.npy
+
+        :param str, file_path: path of the .npy file to save the images to
+        :param int, number_of_images: number of images the dataset will have
+        :param int, image_height:
+        :param int, image_width:
+        :param int, number_of_channels:
+        :param int, max_number_of_vertices: most vertices a polygon in the dataset can have
+        """
+        self.file_path = file_path
+        self.number_of_images = number_of_images
+        self.number_of_images_added = 0
+
+        vertices_path, vertex_counts_path = get_npy_vertices_paths(file_path)
+        self.images = np.lib.format.open_memmap(file_path, mode='w+', dtype=np.uint8,
+                                                shape=(number_of_images, image_height, image_width,
+                                                       number_of_channels))
+        self.vertices = np.lib.format.open_memmap(vertices_path, mode='w+', dtype=np.int32,
+                                                  shape=(number_of_images, max_number_of_vertices, 2))
+        self.vertex_counts = np.lib.format.open_memmap(vertex_counts_path, mode='w+', dtype=np.int32,
+                                                       shape=(number_of_images,))
+
+    def add_image(self,
+                  image,
+                  polygon_vertices=None,
+                  ):
+        """
+        :param image: np.ndarray with shape (image_height, image_width, number_of_channels)
+        :param polygon_vertices: optional np.ndarray of the polygon's vertices, with shape (n, 1, 2)
+        :return: int, image_index: index of the image in the dataset
+        """
+        if polygon_vertices is None:
+            batch_vertices = None
+        else:
+            batch_vertices = [polygon_vertices]
+
+        return self.add_batch(images=image[np.newaxis],
+                              batch_vertices=batch_vertices)
+
+    def add_batch(self,
+                  images,
+                  batch_vertices=None,
+                  ):
+        """
+        :param images: np.ndarray with shape (number_of_images, image_height, image_width, number_of_channels)
+        :param batch_vertices: optional list of np.ndarray of each polygon's vertices, with shape (n, 1, 2)
+        :return: int, first_image_index: index of the first image of the batch in the dataset
+        """
+        first_image_index = self.number_of_images_added
+        last_image_index = first_image_index + len(images)
+        if last_image_index > self.number_of_images:
+            raise IndexError(f'cannot add {len(images)} images to a dataset with {self.number_of_images} images of '
+                             f'which {first_image_index} have been added')
+
+        if batch_vertices is not None:
+            batch_vertices = [polygon_vertices.reshape((-1, 2)) for polygon_vertices in batch_vertices]
+            for polygon_vertices in batch_vertices:
+                if len(polygon_vertices) > self.vertices.shape[1]:
+                    raise ValueError(f'cannot add a polygon with {len(polygon_vertices)} vertices to a dataset of at '
+                                     f'most {self.vertices.shape[1]} vertices, see max_number_of_vertices')
+
+        self.images[first_image_index:last_image_index] = images.reshape((len(images),) + self.images.shape[1:])
+        if batch_vertices is not None:
+            for image_index, polygon_vertices in enumerate(batch_vertices, start=first_image_index):
+                self.vertices[image_index, :len(polygon_vertices)] = polygon_vertices
+                self.vertex_counts[image_index] = len(polygon_vertices)
+
+        self.number_of_images_added = last_image_index
+
+        return first_image_index
+
+    def flush(self):
+        self.images.flush()
+        self.vertices.flush()
+        self.vertex_counts.flush()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_npy_vertices_paths(file_path: str):
+    """
+    :param str, file_path: path of the .npy file of the images
+    :return: (str, str), (vertices_path, vertex_counts_path)
+    """
+    file_path_stem = os.path.splitext(file_path)[0]
+    return f'{file_path_stem}_vertices.npy', f'{file_path_stem}_vertex_counts.npy'
+
+
+def load_npy_dataset(file_path: str):
+    """
+    Memory map a dataset saved by NpyDatasetSink, read only. Slicing the arrays reads only the images sliced.
+
+    :param str, file_path: path of the .npy file of the images
+    :return: (np.memmap, np.memmap, np.memmap), (images, vertices, vertex_counts): the vertices of polygon i are
+     vertices[i, :vertex_counts[i]]
+    """
+    vertices_path, vertex_counts_path = get_npy_vertices_paths(file_path)
+    images = np.load(file_path, mmap_mode='r')
+    vertices = np.load(vertices_path, mmap_mode='r')
+    vertex_counts = np.load(vertex_counts_path, mmap_mode='r')
+
+    return images, vertices, vertex_counts
+
+
+class TarShardSink:
+    def __init__(self,
+                 folder_path: str,
+                 images_per_shard: int = 10000,
+                 file_format: str = 'png',
+                 image_encoder=None,
+                 ):
+        """
+        Images are saved to folder_path/shard_00000.tar, folder_path/shard_00001.tar and so on, and indexed in
+        folder_path/index.jsonl
+
+        :param str, folder_path: folder to save the shards in, created if it does not exist
+        :param int, images_per_shard: number of images in each tar file
+        :param str, file_format: file format for cv2 to encode the images as
+        :param image_encoder: optional ImageEncoder with the encoder settings of the file format, by default cv2's
+        """
+        self.folder_path = folder_path
+        self.images_per_shard = images_per_shard
+        self.file_format = file_format
+        self.image_encoder = image_encoder
+        self.number_of_images_added = 0
+
+        os.makedirs(folder_path, exist_ok=True)
+        self.index_file = open(os.path.join(folder_path, tar_shard_index_file_name), 'w')
+        self.shard_file = None
+
+    def get_shard_name(self,
+                       shard_index: int,
+                       ):
+        return f'shard_{shard_index:05d}.tar'
+
+    def add_image(self,
+                  image,
+                  polygon_vertices=None,
+                  ):
+        """
+        :param image: np.ndarray image to encode and add
+        :param polygon_vertices: optional np.ndarray of the polygon's vertices, with shape (n, 1, 2)
+        :return: int, image_index: index of the image in the dataset
+        """
+        image_index = self.number_of_images_added
+        shard_index = image_index // self.images_per_shard
+        shard_name = self.get_shard_name(shard_index)
+        if image_index % self.images_per_shard == 0:
+            if self.shard_file is not None:
+                self.shard_file.close()
+            self.shard_file = tarfile.open(os.path.join(self.folder_path, shard_name), 'w',
+                                           format=tarfile.USTAR_FORMAT)
+
+        if self.image_encoder is not None:
+            encoded_image = self.image_encoder.encode(image, self.file_format)
+        else:
+            was_encoded, encoded_image = cv2.imencode(f'.{self.file_format}', image)
+            if not was_encoded:
+                raise ValueError(f'could not encode image {image_index} as {self.file_format}')
+        encoded_image = encoded_image.tobytes()
+
+        member = tarfile.TarInfo(name=f'{image_index:09d}.{self.file_format}')
+        member.size = len(encoded_image)
+        # the image data comes straight after its 512 byte ustar header
+        offset = self.shard_file.offset + tarfile.BLOCKSIZE
+        self.shard_file.addfile(member, io.BytesIO(encoded_image))
+
+        index_entry = {
+            'image_index': image_index,
+            'shard': shard_name,
+            'offset': offset,
+            'size': len(encoded_image),
+        }
+        if polygon_vertices is not None:
+            index_entry['vertices'] = polygon_vertices.reshape((-1, 2)).tolist()
+        self.index_file.write(json.dumps(index_entry) + '\n')
+
+        self.number_of_images_added += 1
+
+        return image_index
+
+    def add_batch(self,
+                  images,
+                  batch_vertices=None,
+                  ):
+        """
+        :param images: np.ndarray with shape (number_of_images, image_height, image_width, number_of_channels)
+        :param batch_vertices: optional list of np.ndarray of each polygon's vertices, with shape (n, 1, 2)
+        :return: int, first_image_index: index of the first image of the batch in the dataset
+        """
+        first_image_index = self.number_of_images_added
+        if batch_vertices is None:
+            batch_vertices = [None] * len(images)
+
+        for image, polygon_vertices in zip(images, batch_vertices):
+            self.add_image(image=image,
+                           polygon_vertices=polygon_vertices)
+
+        return first_image_index
+
+    def flush(self):
+        if self.shard_file is not None:
+            self.shard_file.fileobj.flush()
+        self.index_file.flush()
+
+    def close(self):
+        if self.shard_file is not None:
+            self.shard_file.close()
+            self.shard_file = None
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TarShardDataset:
+    """
+    Class to read a dataset saved by TarShardSink. The tar files are memory mapped, so an encoded image is a slice of
+    the file rather than a copy of it.
+    """
+
+    def __init__(self,
+                 folder_path: str,
+                 ):
+        """
+        :param str, folder_path: folder the shards and index were saved in
+        """
+        self.folder_path = folder_path
+        with open(os.path.join(folder_path, tar_shard_index_file_name)) as index_file:
+            self.index = [json.loads(line) for line in index_file]
+        self.shards = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def get_shard(self,
+                  shard_name: str,
+                  ):
+        if shard_name not in self.shards:
+            with open(os.path.join(self.folder_path, shard_name), 'rb') as shard_file:
+                self.shards[shard_name] = mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self.shards[shard_name]
+
+    def get_encoded_image(self,
+                          image_index: int,
+                          ):
+        """
+        :param int, image_index:
+        :return: np.ndarray, encoded_image: uint8 view of the encoded image in the memory mapped shard. The shard stays
+         mapped while the view is alive, even after close, so copy it to keep it for long
+        """
+        index_entry = self.index[image_index]
+        shard = self.get_shard(index_entry['shard'])
+
+        return np.frombuffer(shard, np.uint8, count=index_entry['size'], offset=index_entry['offset'])
+
+    def get_image(self,
+                  image_index: int,
+                  ):
+        """
+        :param int, image_index:
+        :return: np.ndarray, decoded image
+        """
+        return cv2.imdecode(self.get_encoded_image(image_index), cv2.IMREAD_UNCHANGED)
+
+    def get_vertices(self,
+                     image_index: int,
+                     ):
+        """
+        :param int, image_index:
+        :return: np.ndarray, int32 vertices of the polygon with shape (n, 1, 2), or None if none were saved
+        """
+        vertices = self.index[image_index].get('vertices')
+        if vertices is None:
+            return None
+
+        return np.array(vertices, np.int32).reshape((-1, 1, 2))
+
+    def __getitem__(self,
+                    image_index: int,
+                    ):
+        return self.get_image(image_index), self.get_vertices(image_index)
+
+    def close(self):
+        """
+        Unmap the shards. A shard still viewed by an encoded image from get_encoded_image cannot be unmapped yet, and
+        is unmapped once the last view of it is freed instead
+
+        :return:
+        """
+        for shard in self.shards.values():
+            try:
+                shard.close()
+            except BufferError:
+                pass
+        self.shards = {}
@@ -0,0 +1,265 @@
+import os
+import copy
+import json
+import itertools
+import numpy as np
+from polygon_generator.image_writer import ImageWriter
+
+"""
+Datasets that vary the number of vertices, image size and colours from image to image, without setting them on a
+polygon generator before every image. A ParameterSweep lists the values each parameter can take, and either sweeps
+every combination of them or samples each image's parameters at random.
+
+The images are then scheduled in groups with the same parameters, ordered by image size, and each group is drawn in
+batches with generate_batch. The generator's size and colours are set once per group on a copy of it, the batch buffer
+is only allocated again when the image size changes, and the background template is only rebuilt when the size or
+background colour does. The images of a group get consecutive image indices, so each image is drawn from its own
+random generator (see PolygonGenerator.get_image_random_generator) and a seeded sweep gives the same dataset every time.
+
+The parameters of every image are recorded with it:
+parameter_sweep = ParameterSweep(numbers_of_vertices=range(3, 9),
+                                 image_sizes=[(64, 64), (128, 96)],
+                                 shape_colours=[black, red, blue],
+                                 sampling='random')
+parameter_sweep.save(polygon_generator=ConvexPolygonGenerator(image_height=64, image_width=64, number_of_vertices=5,
+                                                              seed=0),
+                     folder_path='sweep_dataset',
+                     number_of_images=10000)
+"""
+
+# ways of choosing each image's parameters, see ParameterSweep
+sweep_samplings = ('product', 'random')
+
+# first word of the spawn key of the random generator the parameters are sampled from, keeps it apart from the per
+#  image random generators the polygons are drawn from
+sweep_stream_key = 0x737770
+
+metadata_file_name = 'metadata.jsonl'
+
+
+class ParameterSweep:
+    def __init__(self,
+                 numbers_of_vertices=None,
+                 image_sizes: list = None,
+                 shape_colours: list = None,
+                 background_colours: list = None,
+                 sampling: str = 'product',
+                 ):
+        """
+        Every parameter left as None keeps the polygon generator's own value for every image
+
+        :param numbers_of_vertices: numbers of vertices to choose from, for example range(3, 9)
+        :param list, image_sizes: (image_height, image_width) sizes to choose from
+        :param list, shape_colours: (b, g, r) shape colours to choose from
+        :param list, background_colours: (b, g, r) background colours to choose from
+        :param str, sampling: one of sweep_samplings
+         'product': every combination of the values, in turn, so a dataset of a multiple of the number of combinations
+          has the same number of images of each
+         'random': each parameter of each image is chosen uniformly at random from its values
+        """
+        if sampling not in sweep_samplings:
+            raise ValueError(f'sampling must be one of {sweep_samplings}, got {sampling!r}')
+
+        self.numbers_of_vertices = None if numbers_of_vertices is None else list(numbers_of_vertices)
+        self.image_sizes = None if image_sizes is None else [tuple(image_size) for image_size in image_sizes]
+        self.shape_colours = None if shape_colours is None else [tuple(colour) for colour in shape_colours]
+        self.background_colours = None if background_colours is None else [tuple(colour)
+                                                                            for colour in background_colours]
+        self.sampling = sampling
+
+        for name, values in self.get_parameter_values(polygon_generator=None).items():
+            if values is not None and not values:
+                raise ValueError(f'{name} must have at least one value')
+
+    def get_parameter_values(self,
+                             polygon_generator,
+                             ):
+        """
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator whose values replace the
+         parameters left as None, or None to leave them as None
+        :return: dict, of the list of values of each parameter
+        """
+        parameter_values = {
+            'number_of_vertices': self.numbers_of_vertices,
+            'image_size': self.image_sizes,
+            'shape_colour': self.shape_colours,
+            'background_colour': self.background_colours,
+        }
+        if polygon_generator is not None:
+            generator_values = {
+                'number_of_vertices': polygon_generator.number_of_vertices,
+                'image_size': (polygon_generator.image_height, polygon_generator.image_width),
+                'shape_colour': tuple(polygon_generator.shape_colour),
+                'background_colour': tuple(polygon_generator.background_colour),
+            }
+            for name, values in parameter_values.items():
+                if values is None:
+                    parameter_values[name] = [generator_values[name]]
+
+        return parameter_values
+
+    def get_settings(self):
+        """
+        :return: dict, settings of the sweep, to save with the dataset
+        """
+        return {
+            'numbers_of_vertices': self.numbers_of_vertices,
+            'image_sizes': self.image_sizes,
+            'shape_colours': self.shape_colours,
+            'background_colours': self.background_colours,
+            'sampling': self.sampling,
+        }
+
+    def get_image_parameters(self,
+                             polygon_generator,
+                             number_of_images: int,
+                             ):
+        """
+        Choose the parameters of every image, in the order they are swept or sampled
+
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator the dataset is drawn with, random
+         samples are drawn from its seed
+        :param int, number_of_images:
+        :return: list, of (number_of_vertices, image_size, shape_colour, background_colour) of each image
+        """
+        parameter_values = list(self.get_parameter_values(polygon_generator).values())
+
+        if self.sampling == 'product':
+            combinations = list(itertools.product(*parameter_values))
+            return [combinations[number % len(combinations)] for number in range(number_of_images)]
+
+        seed_sequence = np.random.SeedSequence(entropy=polygon_generator.seed_sequence.entropy,
+                                               spawn_key=(sweep_stream_key,))
+        random_generator = np.random.default_rng(seed_sequence)
+        value_indices = [random_generator.integers(len(values), size=number_of_images) for values in parameter_values]
+
+        return [tuple(values[value_index] for values, value_index in zip(parameter_values, image_value_indices))
+                for image_value_indices in zip(*(indices.tolist() for indices in value_indices))]
+
+    def get_schedule(self,
+                     polygon_generator,
+                     number_of_images: int,
+                     ):
+        """
+        Group the images by their parameters, ordered by image size so groups of the same size are drawn one after
+        another, then by background colour so the background template is rebuilt as rarely as possible
+
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator the dataset is drawn with
+        :param int, number_of_images:
+        :return: list, of dicts of each group's 'parameters', 'first_image_index' and 'number_of_images'. The groups
+         cover the image indices 0 to number_of_images - 1 in order
+        """
+        group_sizes = {}
+        for image_parameters in self.get_image_parameters(polygon_generator=polygon_generator,
+                                                          number_of_images=number_of_images):
+            group_sizes[image_parameters] = group_sizes.get(image_parameters, 0) + 1
+
+        schedule = []
+        first_image_index = 0
+        for image_parameters in sorted(group_sizes, key=lambda parameters: (parameters[1], parameters[3],
+                                                                            parameters[0], parameters[2])):
+            number_of_vertices, (image_height, image_width), shape_colour, background_colour = image_parameters
+            schedule.append({
+                'parameters': {
+                    'number_of_vertices': number_of_vertices,
+                    'image_height': image_height,
+                    'image_width': image_width,
+                    'shape_colour': shape_colour,
+                    'background_colour': background_colour,
+                },
+                'first_image_index': first_image_index,
+                'number_of_images': group_sizes[image_parameters],
+            })
+            first_image_index += group_sizes[image_parameters]
+
+        return schedule
+
+    def generate_batches(self,
+                         polygon_generator,
+                         number_of_images: int,
+                         batch_size: int = 64,
+                         ):
+        """
+        Draw the images of the sweep group by group, in batches of at most batch_size images of the same parameters.
+        The polygon generator is copied, so its own settings are left as they are and it can keep being used.
+
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator with the other settings and the
+         seed of the dataset
+        :param int, number_of_images:
+        :param int, batch_size:
+        :return: generator of (first_image_index, images, batch_vertices, parameters), where images is drawn into a
+         buffer that is drawn into again by the next batch of the same size, so copy it to keep it, and parameters
+         is the dict of parameters of every image in the batch
+        """
+        schedule = self.get_schedule(polygon_generator=polygon_generator,
+                                     number_of_images=number_of_images)
+        polygon_generator = copy.deepcopy(polygon_generator)
+
+        batch_buffer = None
+        for group in schedule:
+            parameters = group['parameters']
+            polygon_generator.set_image_height(parameters['image_height'])
+            polygon_generator.set_image_width(parameters['image_width'])
+            polygon_generator.set_shape_colour(parameters['shape_colour'])
+            polygon_generator.set_background_colour(parameters['background_colour'])
+
+            batch_shape = (batch_size,) + polygon_generator.get_image_shape()
+            if batch_buffer is None or batch_buffer.shape != batch_shape:
+                batch_buffer = np.empty(batch_shape, np.uint8)
+
+            group_end = group['first_image_index'] + group['number_of_images']
+            for batch_start in range(group['first_image_index'], group_end, batch_size):
+                images, batch_vertices = polygon_generator.generate_batch(
+                    number_of_images=min(batch_size, group_end - batch_start),
+                    number_of_vertices=parameters['number_of_vertices'],
+                    images=batch_buffer[:min(batch_size, group_end - batch_start)],
+                    first_image_index=batch_start)
+                yield batch_start, images, batch_vertices, parameters
+
+    def save(self,
+             polygon_generator,
+             folder_path: str,
+             number_of_images: int,
+             image_name: str = 'generated_polygon',
+             file_format: str = 'jpg',
+             batch_size: int = 64,
+             ):
+        """
+        Save the images of the sweep to folder_path, with a line of json in folder_path/metadata.jsonl for every image
+        giving its file name, parameters and vertices
+
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator with the other settings and the
+         seed of the dataset
+        :param str, folder_path: folder to save the images in, created if it does not exist
+        :param int, number_of_images:
+        :param str, image_name: images are saved as {image_name}_{image index}.{file_format}
+        :param str, file_format: file format for cv2 to save the images as
+        :param int, batch_size:
+        :return: str, metadata_path
+        """
+        os.makedirs(folder_path, exist_ok=True)
+        index_width = len(str(max(number_of_images - 1, 0)))
+        metadata_path = os.path.join(folder_path, metadata_file_name)
+
+        with open(metadata_path, 'w') as metadata_file, ImageWriter() as image_writer:
+            for first_image_index, images, batch_vertices, parameters in self.generate_batches(
+                    polygon_generator=polygon_generator,
+                    number_of_images=number_of_images,
+                    batch_size=batch_size):
+                for image_index, image, polygon_vertices in zip(itertools.count(first_image_index), images,
+                                                                batch_vertices):
+                    path_to_saved_image = image_writer.save_image_to_folder(
+                        folder_path=folder_path,
+                        image_name=f'{image_name}_{image_index:0{index_width}d}',
+                        image=image,
+                        file_format=file_format,
+                    )
+                    image_metadata = {
+                        'image_index': image_index,
+                        'file_name': os.path.basename(path_to_saved_image),
+                        'vertices': polygon_vertices.reshape((-1, 2)).tolist(),
+                    }
+                    image_metadata.update(parameters)
+                    metadata_file.write(json.dumps(image_metadata) + '\n')
+
+        return metadata_path
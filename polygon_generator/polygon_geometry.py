@@ -0,0 +1,189 @@
+import os
+import numpy as np
+
+"""
+Compact store of many polygons' vertices, for when only the geometry is needed and not the images. Instead of an
+(n, 1, 2) array per polygon, the vertices of every polygon are kept one after another in a single flat (total, 2)
+coordinate buffer, with offsets[i]:offsets[i + 1] the rows of polygon i, so a million polygons are two arrays rather
+than a million objects.
+
+Area, perimeter and convexity are worked out for every polygon at once with numpy, and the store is saved as two .npy
+files that load_polygon_geometry maps back into memory without reading them:
+polygon_geometry = polygon_generator.generate_geometry(number_of_polygons=1000000)
+polygon_geometry.save('polygons.npy')
+polygon_geometry = load_polygon_geometry('polygons.npy')
+areas = polygon_geometry.get_areas()
+"""
+
+
+class PolygonGeometry:
+    def __init__(self,
+                 coordinates,
+                 offsets,
+                 ):
+        """
+        :param coordinates: np.ndarray, int32 or float32 vertices of every polygon one after another, with shape
+         (total_number_of_vertices, 2)
+        :param offsets: np.ndarray, int64 with shape (number_of_polygons + 1,), polygon i has the vertices
+         coordinates[offsets[i]:offsets[i + 1]]
+        """
+        self.coordinates = coordinates
+        self.offsets = offsets
+
+    @classmethod
+    def from_polygons(cls,
+                      batch_vertices,
+                      dtype=np.int32,
+                      ):
+        """
+        :param batch_vertices: list of np.ndarray of each polygon's vertices, all with shape (n, 1, 2) or all (n, 2)
+        :param dtype: np.int32 or np.float32, type of the coordinates
+        :return: PolygonGeometry
+        """
+        vertex_counts = [len(polygon_vertices) for polygon_vertices in batch_vertices]
+        if batch_vertices:
+            coordinates = np.concatenate(batch_vertices).reshape((-1, 2))
+        else:
+            coordinates = np.empty((0, 2))
+
+        return cls(coordinates=coordinates.astype(dtype, copy=False),
+                   offsets=get_offsets(vertex_counts))
+
+    @classmethod
+    def concatenate(cls,
+                    polygon_geometries: list,
+                    ):
+        """
+        :param list, polygon_geometries: PolygonGeometry to join one after another
+        :return: PolygonGeometry
+        """
+        coordinates = np.concatenate([polygon_geometry.coordinates for polygon_geometry in polygon_geometries])
+        vertex_counts = np.concatenate([polygon_geometry.get_vertex_counts()
+                                        for polygon_geometry in polygon_geometries])
+
+        return cls(coordinates=coordinates,
+                   offsets=get_offsets(vertex_counts))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self,
+                    polygon_index: int,
+                    ):
+        """
+        :param int, polygon_index:
+        :return: np.ndarray, view of the polygon's vertices with shape (n, 1, 2), as the generators return them
+        """
+        if polygon_index < 0:
+            polygon_index += len(self)
+        start, end = self.offsets[polygon_index], self.offsets[polygon_index + 1]
+
+        return self.coordinates[start:end].reshape((-1, 1, 2))
+
+    def __iter__(self):
+        for polygon_index in range(len(self)):
+            yield self[polygon_index]
+
+    def get_vertex_counts(self):
+        """
+        :return: np.ndarray, number of vertices of each polygon
+        """
+        return np.diff(self.offsets)
+
+    def get_next_vertex_indices(self):
+        """
+        :return: np.ndarray, index in coordinates of the vertex after each vertex around its polygon
+        """
+        next_vertex_indices = np.arange(1, len(self.coordinates) + 1)
+        next_vertex_indices[self.offsets[1:] - 1] = self.offsets[:-1]
+
+        return next_vertex_indices
+
+    def get_edges(self):
+        """
+        :return: np.ndarray, float64 vector from each vertex to the next around its polygon, with shape
+         (total_number_of_vertices, 2)
+        """
+        coordinates = np.asarray(self.coordinates, np.float64)
+
+        return coordinates[self.get_next_vertex_indices()] - coordinates
+
+    def get_areas(self):
+        """
+        :return: np.ndarray, area enclosed by each polygon, by the shoelace formula
+        """
+        coordinates = np.asarray(self.coordinates, np.float64)
+        next_coordinates = coordinates[self.get_next_vertex_indices()]
+        crosses = coordinates[:, 0] * next_coordinates[:, 1] - coordinates[:, 1] * next_coordinates[:, 0]
+
+        return np.abs(self.sum_per_polygon(crosses)) / 2
+
+    def get_perimeters(self):
+        """
+        :return: np.ndarray, perimeter of each polygon
+        """
+        edges = self.get_edges()
+
+        return self.sum_per_polygon(np.hypot(edges[:, 0], edges[:, 1]))
+
+    def get_is_convex(self):
+        """
+        :return: np.ndarray, bool, each polygon turns the same way at every vertex, ignoring collinear vertices
+        """
+        edges = self.get_edges()
+        next_edges = edges[self.get_next_vertex_indices()]
+        turns = edges[:, 0] * next_edges[:, 1] - edges[:, 1] * next_edges[:, 0]
+
+        starts = self.offsets[:-1]
+        return (np.minimum.reduceat(turns, starts) >= 0) | (np.maximum.reduceat(turns, starts) <= 0)
+
+    def sum_per_polygon(self,
+                        values,
+                        ):
+        """
+        :param values: np.ndarray with a value for each vertex
+        :return: np.ndarray, sum of the values of each polygon's vertices
+        """
+        return np.add.reduceat(values, self.offsets[:-1]) if len(self) else np.zeros(0)
+
+    def save(self,
+             file_path: str,
+             ):
+        """
+        Save the coordinates to file_path and the offsets to {file_path stem}_offsets.npy
+
+        :param str, file_path: path of the .npy file to save the coordinates to
+        :return:
+        """
+        np.save(file_path, self.coordinates)
+        np.save(get_offsets_path(file_path), self.offsets)
+
+
+def get_offsets(vertex_counts):
+    """
+    :param vertex_counts: number of vertices of each polygon
+    :return: np.ndarray, int64 offsets of each polygon's vertices, with shape (number_of_polygons + 1,)
+    """
+    offsets = np.zeros(len(vertex_counts) + 1, np.int64)
+    np.cumsum(vertex_counts, out=offsets[1:])
+
+    return offsets
+
+
+def get_offsets_path(file_path: str):
+    """
+    :param str, file_path: path of the .npy file of the coordinates
+    :return: str, offsets_path
+    """
+    return f'{os.path.splitext(file_path)[0]}_offsets.npy'
+
+
+def load_polygon_geometry(file_path: str):
+    """
+    Memory map polygon geometry saved by PolygonGeometry.save, read only
+
+    :param str, file_path: path of the .npy file of the coordinates
+    :return: PolygonGeometry
+    """
+    return PolygonGeometry(coordinates=np.load(file_path, mmap_mode='r'),
+                           offsets=np.load(get_offsets_path(file_path), mmap_mode='r'))
@@ -0,0 +1,191 @@
+import numpy as np
+import cv2
+
+"""
+Rasterizers fill a polygon's vertices into an image. Each mode trades quality for throughput, so the mode can be
+chosen per dataset, with the rough cost of each relative to the default anti_aliased mode:
+
+aliased: every pixel whose centre is inside the polygon is filled, with no edge blending. Convex polygons are filled
+ with cv2.fillConvexPoly in a single scan. The fastest mode, around half the cost of anti_aliased.
+anti_aliased: cv2.fillPoly with cv2.LINE_AA, blending the edge pixels. Float vertices are rounded to whole pixels. The
+ default, and how polygons were always drawn.
+sub_pixel: as anti_aliased, but float vertices are drawn at their exact position to 1 / 2 ** sub_pixel_bits of a pixel
+ using the shift parameter of cv2.fillPoly. About the same cost as anti_aliased. For whole pixel vertices, such as the
+ ones the generators sample, it draws the same image as anti_aliased, but the polygons SceneGenerator scales and
+ places keep their fractional vertices for it.
+supersample: a mask of the polygon's bounding box is drawn aliased at supersample_factor times the size, then area
+ averaged back down, so each edge pixel is blended by the fraction of it the polygon covers, to within about
+ 1 / supersample_factor. The cost grows with supersample_factor ** 2 times the area of the polygon's bounding box,
+ for the default factor of 4 around 10 to 25 times the cost of anti_aliased. See python -m benchmarks for the costs
+ on a given machine.
+
+Any object with the same fill_polygon and get_settings methods can be set as a generator's rasterizer with
+PolygonGenerator.set_rasterizer.
+"""
+
+rasterizer_modes = ('aliased', 'anti_aliased', 'sub_pixel', 'supersample')
+
+# modes that draw float vertices at their exact position rather than rounding them to whole pixels
+sub_pixel_rasterizer_modes = ('sub_pixel', 'supersample')
+
+
+class Rasterizer:
+    def __init__(self,
+                 rasterizer_mode: str = 'anti_aliased',
+                 supersample_factor: int = 4,
+                 sub_pixel_bits: int = 4,
+                 ):
+        """
+        :param str, rasterizer_mode: one of rasterizer_modes
+        :param int, supersample_factor: number of samples along each side of a pixel in the supersample mode
+        :param int, sub_pixel_bits: number of fractional bits of the vertex coordinates in the sub_pixel and
+         supersample modes
+        """
+        if rasterizer_mode not in rasterizer_modes:
+            raise ValueError(f'rasterizer_mode must be one of {rasterizer_modes}, not {rasterizer_mode!r}')
+        if supersample_factor < 1:
+            raise ValueError(f'supersample_factor must be at least 1, not {supersample_factor}')
+
+        self.rasterizer_mode = rasterizer_mode
+        self.supersample_factor = supersample_factor
+        self.sub_pixel_bits = sub_pixel_bits
+
+    def get_settings(self):
+        """
+        :return: dict, settings: every setting that changes the pixels drawn
+        """
+        settings = {
+            'rasterizer_mode': self.rasterizer_mode,
+        }
+        if self.rasterizer_mode in ('sub_pixel', 'supersample'):
+            settings['sub_pixel_bits'] = self.sub_pixel_bits
+        if self.rasterizer_mode == 'supersample':
+            settings['supersample_factor'] = self.supersample_factor
+
+        return settings
+
+    def fill_polygon(self,
+                     image,
+                     polygon_vertices,
+                     colour: tuple,
+                     is_convex: bool = False,
+                     ):
+        """
+        Fill a polygon into an image in place, with the vertices at pixel centres, so vertex (x, y) is the centre of
+        pixel image[y, x]
+
+        :param image: np.ndarray to draw into
+        :param polygon_vertices: np.ndarray of the vertices in order around the polygon, with shape (n, 1, 2) or
+         (n, 2), int32 or float
+        :param tuple, colour:
+        :param bool, is_convex: the polygon is known to be convex, which lets the aliased mode use a faster fill
+        :return: np.ndarray, image
+        """
+        if self.rasterizer_mode == 'aliased':
+            polygon_vertices = get_pixel_vertices(polygon_vertices)
+            if is_convex:
+                cv2.fillConvexPoly(img=image,
+                                   points=polygon_vertices,
+                                   color=colour,
+                                   lineType=cv2.LINE_8,
+                                   )
+            else:
+                cv2.fillPoly(img=image,
+                             pts=[polygon_vertices],
+                             color=colour,
+                             lineType=cv2.LINE_8,
+                             )
+
+        elif self.rasterizer_mode == 'anti_aliased':
+            cv2.fillPoly(img=image,
+                         pts=[get_pixel_vertices(polygon_vertices)],
+                         color=colour,
+                         lineType=cv2.LINE_AA,
+                         )
+
+        elif self.rasterizer_mode == 'sub_pixel':
+            cv2.fillPoly(img=image,
+                         pts=[get_fixed_point_vertices(polygon_vertices, self.sub_pixel_bits)],
+                         color=colour,
+                         lineType=cv2.LINE_AA,
+                         shift=self.sub_pixel_bits,
+                         )
+
+        else:
+            self.fill_polygon_supersampled(image=image,
+                                           polygon_vertices=polygon_vertices,
+                                           colour=colour)
+
+        return image
+
+    def fill_polygon_supersampled(self,
+                                  image,
+                                  polygon_vertices,
+                                  colour: tuple,
+                                  ):
+        """
+        Fill a polygon by drawing a mask of its bounding box at supersample_factor times the size and area averaging
+        it back down into the coverage of each pixel, see fill_polygon
+
+        :return: np.ndarray, image
+        """
+        supersample_factor = self.supersample_factor
+        polygon_vertices = np.asarray(polygon_vertices, np.float64).reshape((-1, 2))
+
+        # pixels the polygon can touch, pixel k covering from k - 0.5 to k + 0.5
+        image_height, image_width = image.shape[:2]
+        x_start, y_start = np.maximum(np.floor(polygon_vertices.min(axis=0) + 0.5).astype(int), 0)
+        x_end, y_end = np.minimum(np.floor(polygon_vertices.max(axis=0) + 0.5).astype(int) + 1,
+                                  (image_width, image_height))
+        if x_start >= x_end or y_start >= y_end:
+            return image
+
+        tile = image[y_start:y_end, x_start:x_end]
+        tile_height, tile_width = tile.shape[:2]
+
+        # the centre of pixel k is at the centre of the block of large pixels from k * factor to (k + 1) * factor - 1
+        large_vertices = (supersample_factor * (polygon_vertices - (x_start, y_start))
+                          + (supersample_factor - 1) / 2)
+        large_mask = np.zeros((tile_height * supersample_factor, tile_width * supersample_factor), np.uint8)
+        cv2.fillPoly(img=large_mask,
+                     pts=[get_fixed_point_vertices(large_vertices, self.sub_pixel_bits)],
+                     color=255,
+                     lineType=cv2.LINE_8,
+                     shift=self.sub_pixel_bits,
+                     )
+
+        # fraction of each pixel the polygon covers, used to blend the colour over what is already drawn
+        coverage = cv2.resize(large_mask, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+        if tile.ndim == 3:
+            coverage = cv2.merge([coverage] * tile.shape[2])
+        colour_tile = np.empty_like(tile)
+        colour_tile[...] = np.reshape(colour, -1)[:colour_tile.shape[-1] if tile.ndim == 3 else 1]
+        tile[...] = cv2.add(cv2.multiply(colour_tile, coverage, scale=1 / 255),
+                            cv2.multiply(tile, 255 - coverage, scale=1 / 255))
+
+        return image
+
+
+def get_pixel_vertices(polygon_vertices):
+    """
+    :param polygon_vertices: np.ndarray of vertices, int32 or float
+    :return: np.ndarray, int32 vertices with shape (n, 1, 2), rounded to whole pixels
+    """
+    polygon_vertices = np.asarray(polygon_vertices)
+    if polygon_vertices.dtype != np.int32:
+        polygon_vertices = np.round(polygon_vertices).astype(np.int32)
+
+    return polygon_vertices.reshape((-1, 1, 2))
+
+
+def get_fixed_point_vertices(polygon_vertices,
+                             sub_pixel_bits: int,
+                             ):
+    """
+    :param polygon_vertices: np.ndarray of vertices, int32 or float
+    :param int, sub_pixel_bits: number of fractional bits
+    :return: np.ndarray, int32 vertices with shape (n, 1, 2), in units of 1 / 2 ** sub_pixel_bits of a pixel
+    """
+    polygon_vertices = np.asarray(polygon_vertices, np.float64) * (1 << sub_pixel_bits)
+
+    return np.round(polygon_vertices).astype(np.int32).reshape((-1, 1, 2))
@@ -0,0 +1,287 @@
+import time
+import numpy as np
+import cv2
+from polygon_generator.rasterizer import sub_pixel_rasterizer_modes
+
+"""
+Compose scenes of many polygons on one canvas, for example for object detection datasets. Polygons are built with a
+ConvexPolygonGenerator or ConcavePolygonGenerator, scaled to a random size and placed at a random position where their
+bounding box does not overlap the ones already placed by more than max_overlap. The bounding boxes placed so far are
+kept in a uniform grid, so checking a new polygon only compares it with the boxes in the cells it covers, rather than
+with every polygon in the scene.
+
+Polygons are drawn in the order they were placed, so with overlap allowed the later polygons occlude the earlier ones.
+With a 'sub_pixel' or 'supersample' rasterizer the scaled and placed vertices are kept as floats and drawn at their
+exact position, otherwise they are rounded to whole pixels.
+
+scene_generator = SceneGenerator(polygon_generator=ConvexPolygonGenerator(image_height=512, image_width=512,
+                                                                          number_of_vertices=6, seed=0),
+                                 number_of_polygons=100,
+                                 max_polygon_size=48)
+image, scene_vertices, bounding_boxes = scene_generator.generate_scene(image_index=0)
+"""
+
+
+class BoundingBoxGrid:
+    """
+    Class to index axis aligned bounding boxes in a uniform grid of square cells, to find the boxes that overlap a box
+    without checking every box
+    """
+
+    def __init__(self,
+                 cell_size: int,
+                 ):
+        """
+        :param int, cell_size: width and height of each cell in pixels, best around the size of the typical box
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.bounding_boxes = []
+
+    def get_cells(self,
+                  bounding_box: tuple,
+                  ):
+        """
+        :param tuple, bounding_box: (x_min, y_min, x_max, y_max), with the maximums excluded
+        :return: generator of the (column, row) of every cell the box covers
+        """
+        x_min, y_min, x_max, y_max = bounding_box
+        cell_size = self.cell_size
+        for row in range(y_min // cell_size, (y_max - 1) // cell_size + 1):
+            for column in range(x_min // cell_size, (x_max - 1) // cell_size + 1):
+                yield column, row
+
+    def get_max_overlap(self,
+                        bounding_box: tuple,
+                        ):
+        """
+        :param tuple, bounding_box: (x_min, y_min, x_max, y_max), with the maximums excluded
+        :return: float, the largest area the box shares with any box in the grid, as a fraction of the smaller of the
+         two boxes
+        """
+        x_min, y_min, x_max, y_max = bounding_box
+        area = (x_max - x_min) * (y_max - y_min)
+
+        checked_box_indices = set()
+        max_overlap = 0.0
+        for cell in self.get_cells(bounding_box):
+            for box_index in self.cells.get(cell, ()):
+                if box_index in checked_box_indices:
+                    continue
+                checked_box_indices.add(box_index)
+
+                other_x_min, other_y_min, other_x_max, other_y_max = self.bounding_boxes[box_index]
+                overlap_width = min(x_max, other_x_max) - max(x_min, other_x_min)
+                overlap_height = min(y_max, other_y_max) - max(y_min, other_y_min)
+                if overlap_width <= 0 or overlap_height <= 0:
+                    continue
+                other_area = (other_x_max - other_x_min) * (other_y_max - other_y_min)
+                max_overlap = max(max_overlap, overlap_width * overlap_height / min(area, other_area))
+
+        return max_overlap
+
+    def add(self,
+            bounding_box: tuple,
+            ):
+        """
+        :param tuple, bounding_box: (x_min, y_min, x_max, y_max), with the maximums excluded
+        :return: int, box_index
+        """
+        box_index = len(self.bounding_boxes)
+        self.bounding_boxes.append(bounding_box)
+        for cell in self.get_cells(bounding_box):
+            self.cells.setdefault(cell, []).append(box_index)
+
+        return box_index
+
+
+class SceneGenerator:
+    def __init__(self,
+                 polygon_generator,
+                 number_of_polygons: int = 50,
+                 min_polygon_size: int = 8,
+                 max_polygon_size: int = None,
+                 max_overlap: float = 0.0,
+                 max_placement_attempts: int = 20,
+                 shape_colours: list = None,
+                 ):
+        """
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator to build the polygons with. Its
+         image size, number of vertices, background colour, rasterizer, seed and stats are used for the scenes
+        :param int, number_of_polygons: number of polygons to try to place in each scene
+        :param int, min_polygon_size: smallest size in pixels of the longer side of a polygon's bounding box
+        :param int, max_polygon_size: largest size in pixels of the longer side of a polygon's bounding box, by default
+         a quarter of the shorter side of the image
+        :param float, max_overlap: most a polygon's bounding box can overlap another's, as a fraction of the smaller of
+         the two boxes. 0 for no overlap, 1 to place polygons anywhere
+        :param int, max_placement_attempts: number of random positions to try for a polygon before leaving it out of
+         the scene, so a crowded scene can have fewer than number_of_polygons polygons
+        :param list, shape_colours: colours to pick from at random for each polygon, by default the polygon
+         generator's shape colour
+        """
+        if max_polygon_size is None:
+            max_polygon_size = max(min(polygon_generator.image_height, polygon_generator.image_width) // 4,
+                                   min_polygon_size)
+        if not 0 < min_polygon_size <= max_polygon_size:
+            raise ValueError(f'polygon sizes must have 0 < min_polygon_size <= max_polygon_size, got '
+                             f'{min_polygon_size} and {max_polygon_size}')
+        if max_polygon_size > min(polygon_generator.image_height, polygon_generator.image_width):
+            raise ValueError(f'max_polygon_size {max_polygon_size} does not fit in a '
+                             f'{polygon_generator.image_width} x {polygon_generator.image_height} image')
+
+        self.polygon_generator = polygon_generator
+        self.number_of_polygons = number_of_polygons
+        self.min_polygon_size = min_polygon_size
+        self.max_polygon_size = max_polygon_size
+        self.max_overlap = max_overlap
+        self.max_placement_attempts = max_placement_attempts
+        self.shape_colours = shape_colours
+
+    def get_settings(self):
+        """
+        :return: dict, settings: every setting that changes the scenes drawn, apart from the seed
+        """
+        settings = self.polygon_generator.get_settings()
+        settings['scene'] = {
+            'number_of_polygons': self.number_of_polygons,
+            'min_polygon_size': self.min_polygon_size,
+            'max_polygon_size': self.max_polygon_size,
+            'max_overlap': self.max_overlap,
+            'max_placement_attempts': self.max_placement_attempts,
+            'shape_colours': None if self.shape_colours is None else [list(colour) for colour in self.shape_colours],
+        }
+
+        return settings
+
+    def get_scaled_polygons(self,
+                            random_generator,
+                            ):
+        """
+        Build number_of_polygons polygons at once with the polygon generator and scale each to a random size, keeping
+        its aspect ratio
+
+        :param random_generator: np.random.Generator to draw from
+        :return: list, of np.ndarray float vertices with shape (m, 2), with the bounding box starting at (0, 0)
+        """
+        polygon_generator = self.polygon_generator
+        batch_points = polygon_generator.sample_random_points(
+            size=(self.number_of_polygons, polygon_generator.number_of_vertices, 1),
+            random_generator=random_generator)
+        batch_vertices = polygon_generator.get_polygons(batch_points=batch_points,
+                                                        random_generator=random_generator)
+        polygon_sizes = random_generator.uniform(self.min_polygon_size, self.max_polygon_size,
+                                                 size=self.number_of_polygons)
+
+        scaled_polygons = []
+        for polygon_vertices, polygon_size in zip(batch_vertices, polygon_sizes):
+            polygon_vertices = polygon_vertices.reshape((-1, 2)).astype(np.float64)
+            polygon_vertices -= polygon_vertices.min(axis=0)
+            # the size is measured between the outer edges of the pixels, one more than between the vertices
+            polygon_vertices *= (polygon_size - 1) / max(polygon_vertices.max(), 1)
+            scaled_polygons.append(polygon_vertices)
+
+        return scaled_polygons
+
+    def place_polygon(self,
+                      polygon_vertices,
+                      grid: BoundingBoxGrid,
+                      random_generator,
+                      ):
+        """
+        Try random positions for a polygon until its bounding box overlaps the placed ones by at most max_overlap
+
+        :param polygon_vertices: np.ndarray, float vertices with shape (m, 2), see get_scaled_polygons
+        :param BoundingBoxGrid, grid: bounding boxes of the polygons placed so far, the new one is added to it
+        :param random_generator: np.random.Generator to draw from
+        :return: np.ndarray, vertices with shape (m, 1, 2) at their place in the image, or None if no place was found.
+         float64 if the polygon generator's rasterizer draws sub pixel vertices, see sub_pixel_rasterizer_modes,
+         otherwise int32
+        """
+        image_size = np.array((self.polygon_generator.image_width, self.polygon_generator.image_height))
+        polygon_width, polygon_height = polygon_vertices.max(axis=0)
+        keeps_float_vertices = (self.polygon_generator.rasterizer.get_settings().get('rasterizer_mode')
+                                in sub_pixel_rasterizer_modes)
+        offsets = random_generator.uniform(0, image_size - 1 - (polygon_width, polygon_height),
+                                           size=(self.max_placement_attempts, 2))
+
+        for x_offset, y_offset in offsets.tolist():
+            # rounding keeps the order of the coordinates, so the box of the rounded vertices is the rounded box
+            bounding_box = (round(x_offset), round(y_offset),
+                            round(polygon_width + x_offset) + 1, round(polygon_height + y_offset) + 1)
+            if grid.get_max_overlap(bounding_box) <= self.max_overlap:
+                grid.add(bounding_box)
+                placed_vertices = polygon_vertices + (x_offset, y_offset)
+                if keeps_float_vertices:
+                    return placed_vertices.reshape((-1, 1, 2))
+
+                placed_vertices = np.round(placed_vertices).astype(np.int32)
+                if self.polygon_generator.polygons_are_convex:
+                    # rounding a scaled down convex polygon to whole pixels can dent it, so drop the vertices that
+                    #  are no longer on its hull, keeping the rest in order
+                    hull_indices = cv2.convexHull(placed_vertices, returnPoints=False).ravel()
+                    placed_vertices = placed_vertices[np.sort(hull_indices)]
+                return placed_vertices.reshape((-1, 1, 2))
+
+        return None
+
+    def generate_scene(self,
+                       image_index: int = None,
+                       ):
+        """
+        Place up to number_of_polygons polygons, then draw them all onto a fresh canvas in one pass
+
+        :param int, image_index: index of the scene in a dataset, if given the scene is drawn from the image's own
+         random generator, see PolygonGenerator.get_image_random_generator
+        :return: (np.ndarray, list, np.ndarray), (image, scene_vertices, bounding_boxes): the image is the polygon
+         generator's image, scene_vertices has the (m, 1, 2) vertex array of each polygon in the order drawn, and
+         bounding_boxes has shape (number_of_polygons_placed, 4) with the (x_min, y_min, x_max, y_max) of each polygon,
+         with the maximums excluded
+        """
+        polygon_generator = self.polygon_generator
+        if image_index is None:
+            random_generator = polygon_generator.random_generator
+        else:
+            random_generator = polygon_generator.get_image_random_generator(image_index)
+
+        stats = polygon_generator.stats
+        if stats is not None:
+            stage_start = time.perf_counter()
+
+        grid = BoundingBoxGrid(cell_size=self.max_polygon_size)
+        scene_vertices = []
+        for polygon_vertices in self.get_scaled_polygons(random_generator):
+            polygon_vertices = self.place_polygon(polygon_vertices=polygon_vertices,
+                                                  grid=grid,
+                                                  random_generator=random_generator)
+            if polygon_vertices is not None:
+                scene_vertices.append(polygon_vertices)
+
+        if self.shape_colours is None:
+            shape_colours = [polygon_generator.shape_colour] * len(scene_vertices)
+        else:
+            shape_colours = [self.shape_colours[colour_index]
+                             for colour_index in random_generator.integers(len(self.shape_colours),
+                                                                           size=len(scene_vertices))]
+
+        if stats is not None:
+            stage_start = stats.record_time('construction', stage_start)
+
+        polygon_generator.reset()
+        image = polygon_generator.image
+
+        if stats is not None:
+            stage_start = stats.record_time('reset', stage_start)
+
+        for polygon_vertices, shape_colour in zip(scene_vertices, shape_colours):
+            polygon_generator.rasterizer.fill_polygon(image=image,
+                                                      polygon_vertices=polygon_vertices,
+                                                      colour=polygon_generator.get_canvas_colour(shape_colour),
+                                                      is_convex=polygon_generator.polygons_are_convex)
+
+        if stats is not None:
+            stats.record_time('rasterization', stage_start)
+            stats.increment('images_generated')
+
+        bounding_boxes = np.array(grid.bounding_boxes, np.int32).reshape((-1, 4))
+
+        return image, scene_vertices, bounding_boxes
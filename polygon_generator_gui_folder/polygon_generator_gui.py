@@ -1,10 +1,15 @@
 import os
 import sys
+import copy
+import json
+import time
+from collections import OrderedDict
 from PyQt5 import QtGui, QtWidgets, QtCore
 from PyQt5.QtWidgets import QApplication
 from polygon_generator_gui_folder.designer_polygon_generator_gui import Ui_MainWindow
 from polygon_generator.polygon_generator import ConcavePolygonGenerator, ConvexPolygonGenerator
-from polygon_generator.folder import save_image_to_folder
+from polygon_generator.image_writer import ImageWriter
+from polygon_generator.labels import CocoAnnotationWriter
 
 """
 Overall process of making an executable file starting from designing the application in QtDesigner. this is being run 
@@ -53,6 +58,120 @@ file that will launch the polygon generator gui application
 """
 
 
+# milliseconds to wait after the last change of a setting before drawing the preview again
+preview_delay_ms = 150
+# number of previews to keep, one per combination of settings
+preview_cache_size = 32
+
+
+def get_qimage(image):
+    """
+    Wrap an image drawn by a polygon generator in a QImage without copying it. The QImage reads the array's memory, so
+    the array must be kept alive and unchanged while it is used, for example by turning it straight into a QPixmap,
+    which copies it.
+
+    :param image: np.ndarray, uint8 (b, g, r) image with shape (height, width, 3), or grey image with shape
+     (height, width)
+    :return: QtGui.QImage
+    """
+    height, width = image.shape[:2]
+    if image.ndim == 2:
+        return QtGui.QImage(image.data, width, height, image.strides[0], QtGui.QImage.Format_Grayscale8)
+
+    if hasattr(QtGui.QImage, 'Format_BGR888'):
+        return QtGui.QImage(image.data, width, height, image.strides[0], QtGui.QImage.Format_BGR888)
+
+    # before Qt 5.14 there is no bgr format, so the channels are swapped, which copies the image
+    return QtGui.QImage(image.data, width, height, image.strides[0], QtGui.QImage.Format_RGB888).rgbSwapped()
+
+
+class ImageGenerationThread(QtCore.QThread):
+    """
+    Thread to generate and save images away from the Qt main thread, so the GUI stays responsive however many images
+    are generated. The images are encoded and written on an ImageWriter's pool of threads while the next ones are
+    drawn.
+
+    Progress is sent with the progress signal at most every progress_interval seconds rather than for every image, and
+    requestInterruption cancels the job after the image being drawn.
+    """
+    # images done so far, and images per second
+    progress = QtCore.pyqtSignal(int, float)
+    # images done, and whether the job was cancelled before the end
+    done = QtCore.pyqtSignal(int, bool)
+    # message of the error that stopped the job
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self,
+                 polygon_generator,
+                 folder_path: str,
+                 number_of_images: int,
+                 image_name: str = 'generated_polygon',
+                 file_format: str = 'jpg',
+                 progress_interval: float = 0.1,
+                 parent=None,
+                 ):
+        """
+        :param polygon_generator: ConvexPolygonGenerator or ConcavePolygonGenerator with the settings for the images,
+         copied so changing the settings in the GUI does not change a job already running
+        :param str, folder_path: folder to save the images and their annotations.json in
+        :param int, number_of_images:
+        :param str, image_name: images are saved as {image_name}_{index}.{file_format}
+        :param str, file_format:
+        :param float, progress_interval: fewest seconds between two progress signals
+        :param parent: optional QObject parent
+        """
+        super(ImageGenerationThread, self).__init__(parent)
+        self.polygon_generator = copy.deepcopy(polygon_generator)
+        # a child of the GUI's generator, so every job draws different polygons rather than repeating the copied state
+        self.polygon_generator.random_generator = polygon_generator.spawn_random_generators(1)[0]
+        self.folder_path = folder_path
+        self.number_of_images = number_of_images
+        self.image_name = image_name
+        self.file_format = file_format
+        self.progress_interval = progress_interval
+
+    def run(self):
+        polygon_generator = self.polygon_generator
+        # every image is copied by the image writer when it is queued, so one canvas is drawn on over and over
+        polygon_generator.set_reuse_image(True)
+        # time each stage while generating, so the speed can be shown as it goes
+        stats = polygon_generator.enable_stats()
+
+        number_of_images_done = 0
+        last_progress_time = time.perf_counter()
+        try:
+            # labels of every polygon go into one annotations.json beside the images
+            with CocoAnnotationWriter(folder_path=self.folder_path,
+                                      info=polygon_generator.get_settings()) as annotation_writer, \
+                    ImageWriter(stats=stats) as image_writer:
+                for index in range(self.number_of_images):
+                    if self.isInterruptionRequested():
+                        break
+
+                    generated_polygon_image = polygon_generator.generate_polygon()
+                    path_to_saved_image = image_writer.save_image_to_folder(folder_path=self.folder_path,
+                                                                            image_name=f'{self.image_name}_{index}',
+                                                                            image=generated_polygon_image,
+                                                                            file_format=self.file_format,
+                                                                            )
+                    annotation_writer.add_image(file_name=os.path.basename(path_to_saved_image),
+                                                image_height=polygon_generator.image_height,
+                                                image_width=polygon_generator.image_width,
+                                                batch_labels=[polygon_generator.get_labels()])
+                    number_of_images_done = index + 1
+
+                    now = time.perf_counter()
+                    if now - last_progress_time >= self.progress_interval:
+                        last_progress_time = now
+                        self.progress.emit(number_of_images_done, stats.get_images_per_second())
+        except Exception as error:
+            self.failed.emit(str(error))
+            return
+
+        self.progress.emit(number_of_images_done, stats.get_images_per_second())
+        self.done.emit(number_of_images_done, number_of_images_done < self.number_of_images)
+
+
 class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
     def __init__(self, parent=None):
         super(PolygonGeneratorApp, self).__init__(parent)
@@ -64,6 +183,16 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
         self.number_of_images_to_generate = 10
         self.folder_to_save_to = None
         self.file_format = 'jpg'
+        # thread of the images being generated, None when no job is running
+        self.image_generation_thread = None
+
+        # the preview is drawn again once the settings stop changing for preview_delay_ms, and previews already drawn
+        #  are kept by their settings, so going back to earlier settings shows the same polygon again at once
+        self.preview_cache = OrderedDict()
+        self.preview_timer = QtCore.QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(preview_delay_ms)
+        self.preview_timer.timeout.connect(self.update_preview)
 
         # create an instance of both generator types and update them both, since there is no easy way to switch
         # between making convex and concave polygons at the moment
@@ -75,6 +204,10 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
                                                                  image_width=480,
                                                                  number_of_vertices=5)
 
+        # most vertices the spin box offers for concave polygons, set in the .ui file
+        self.most_vertices = self.spinBox_number_of_vertices.maximum()
+        self.update_most_vertices()
+
     """
     Define methods here
     The methods here take in the values from the gui and can do thing. So here is where the polygon generator can be 
@@ -119,6 +252,7 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
         palette = self.label_background_colour.palette()
         palette.setColor(self.backgroundRole(), color)
         self.label_background_colour.setPalette(palette)
+        self.schedule_preview()
 
     def set_shape_colour(self):
         color = QtWidgets.QColorDialog.getColor()
@@ -139,20 +273,34 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
         palette = self.label_shape_colour.palette()
         palette.setColor(self.backgroundRole(), color)
         self.label_shape_colour.setPalette(palette)
+        self.schedule_preview()
 
     def set_generator_to_concave(self):
         self.generate_convex_polygon = False
+        self.update_most_vertices()
+        self.schedule_preview()
         # print(f'generator set to convex: {self.generate_convex_polygon}')
 
     def set_generator_to_convex(self):
         self.generate_convex_polygon = True
+        self.update_most_vertices()
+        self.schedule_preview()
         # print(f'generator set to convex: {self.generate_convex_polygon}')
 
     def set_number_of_vertices(self):
         self.convex_polygon_generator.set_number_of_vertices(self.spinBox_number_of_vertices.value())
         self.concave_polygon_generator.set_number_of_vertices(self.spinBox_number_of_vertices.value())
+        self.schedule_preview()
         # print(f'polygon generator n of vertices: {self.convex_polygon_generator.number_of_vertices}')
 
+    def update_most_vertices(self):
+        # convex polygons fit fewer vertices in smaller images, so the spin box only offers as many as fit, and
+        #  lowering its maximum lowers its value with it
+        most_vertices = self.most_vertices
+        if self.generate_convex_polygon is True:
+            most_vertices = min(most_vertices, self.convex_polygon_generator.get_most_vertices())
+        self.spinBox_number_of_vertices.setMaximum(max(most_vertices, self.spinBox_number_of_vertices.minimum()))
+
     def set_number_of_images_to_generate(self):
         self.number_of_images_to_generate = self.spinBox_number_of_images_to_generate.value()
         # print(f'number of images to generate: {self.number_of_images_to_generate}')
@@ -164,19 +312,52 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
     def set_image_width(self):
         self.convex_polygon_generator.set_image_width(self.spinBox_image_width.value())
         self.concave_polygon_generator.set_image_width(self.spinBox_image_width.value())
+        self.update_most_vertices()
+        self.schedule_preview()
         # print(f'polygon generator image width: {self.concave_polygon_generator.image_width}')
 
     def set_image_height(self):
         self.convex_polygon_generator.set_image_height(self.spinBox_image_height.value())
         self.concave_polygon_generator.set_image_height(self.spinBox_image_height.value())
+        self.update_most_vertices()
+        self.schedule_preview()
         # print(f'polygon generator image height: {self.concave_polygon_generator.image_height}')
 
-    def draw_sample_polygon(self):
-        chosen_polygon_generator = None
+    def get_chosen_polygon_generator(self):
         if self.generate_convex_polygon is True:
-            chosen_polygon_generator = self.convex_polygon_generator
-        else:
-            chosen_polygon_generator = self.concave_polygon_generator
+            return self.convex_polygon_generator
+
+        return self.concave_polygon_generator
+
+    def get_preview_key(self):
+        """
+        :return: str, key of the preview for the current settings and size of the preview label
+        """
+        preview_settings = {
+            'settings': self.get_chosen_polygon_generator().get_settings(),
+            'label_height': self.label_sample_polygon_image.height(),
+            'label_width': self.label_sample_polygon_image.width(),
+        }
+
+        return json.dumps(preview_settings, sort_keys=True, default=str)
+
+    def schedule_preview(self):
+        # restarting the timer on every change means a burst of changes draws one preview, after the last of them
+        self.preview_timer.start()
+
+    def update_preview(self):
+        pixmap = self.preview_cache.get(self.get_preview_key())
+        if pixmap is None:
+            self.draw_sample_polygon()
+            return
+
+        self.preview_cache.move_to_end(self.get_preview_key())
+        self.label_sample_polygon_image.setPixmap(pixmap)
+        self.label_sample_polygon_image.show()
+
+    def draw_sample_polygon(self):
+        chosen_polygon_generator = self.get_chosen_polygon_generator()
+        preview_key = self.get_preview_key()
 
         number_of_vertices = chosen_polygon_generator.number_of_vertices
 
@@ -189,22 +370,22 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
         chosen_polygon_generator.set_image_height(label_height)
         chosen_polygon_generator.set_image_width(label_width)
 
+        # the preview label can be smaller than the image, so the preview has no more vertices than fit in it
+        if chosen_polygon_generator is self.convex_polygon_generator:
+            number_of_vertices = min(number_of_vertices, chosen_polygon_generator.get_most_vertices())
+
         generated_sample_image = chosen_polygon_generator.generate_polygon(number_of_vertices=number_of_vertices)
 
-        folder_to_save_to = self.folder_to_save_to
-        if folder_to_save_to is None:
-            folder_to_save_to = os.getcwd()
-        file_format = self.file_format
-        image_path = save_image_to_folder(folder_path=folder_to_save_to,
-                                          image_name=f'sample_image',
-                                          image=generated_sample_image,
-                                          file_format=file_format,
-                                          )
-        pixmap = QtGui.QPixmap(image_path)
+        # drawn straight from the generator's array, the pixmap takes its own copy so the array can be drawn on again
+        pixmap = QtGui.QPixmap.fromImage(get_qimage(chosen_polygon_generator.expand_image(generated_sample_image)))
         self.label_sample_polygon_image.setPixmap(pixmap)
         self.label_sample_polygon_image.show()
 
-        os.remove(os.path.join(folder_to_save_to, f'sample_image.{file_format}'))
+        self.preview_cache[preview_key] = pixmap
+        self.preview_cache.move_to_end(preview_key)
+        if len(self.preview_cache) > preview_cache_size:
+            self.preview_cache.popitem(last=False)
+
         chosen_polygon_generator.set_image_height(set_height)
         chosen_polygon_generator.set_image_width(set_width)
 
@@ -218,41 +399,73 @@ class PolygonGeneratorApp(QtWidgets.QMainWindow, Ui_MainWindow):
 
     def generate_images(self):
         # print(f'generate images')
-        if self.folder_to_save_to is None:
+        if self.folder_to_save_to is None or self.image_generation_thread is not None:
             return
-        chosen_polygon_generator = None
-        if self.generate_convex_polygon is True:
-            chosen_polygon_generator = self.convex_polygon_generator
-        else:
-            chosen_polygon_generator = self.concave_polygon_generator
+        chosen_polygon_generator = self.get_chosen_polygon_generator()
 
-        folder_to_save_to = self.folder_to_save_to
-        number_of_vertices = chosen_polygon_generator.number_of_vertices
-        image_name = 'generated_polygon'
-        file_format = self.file_format
+        number_of_images_to_generate = self.number_of_images_to_generate
 
-        dialog = QtWidgets.QDialog()
+        dialog = QtWidgets.QDialog(self)
         dialog.setWindowTitle("Download progress")
         dialog.resize(350, 100)
         horizontal_layout = QtWidgets.QHBoxLayout(dialog)
         progress_bar = QtWidgets.QProgressBar()
         progress_bar.setMinimum(0)
-        progress_bar.setMaximum(self.number_of_images_to_generate-1)
+        progress_bar.setMaximum(number_of_images_to_generate)
         progress_bar.setValue(0)
         horizontal_layout.addWidget(progress_bar)
+        images_per_second_label = QtWidgets.QLabel()
+        horizontal_layout.addWidget(images_per_second_label)
+        cancel_button = QtWidgets.QPushButton('Cancel')
+        horizontal_layout.addWidget(cancel_button)
+
+        # generate on a worker thread, the main thread only handles the progress signals and stays responsive
+        image_generation_thread = ImageGenerationThread(polygon_generator=chosen_polygon_generator,
+                                                        folder_path=self.folder_to_save_to,
+                                                        number_of_images=number_of_images_to_generate,
+                                                        file_format=self.file_format,
+                                                        parent=self)
+        self.image_generation_thread = image_generation_thread
+
+        def show_progress(number_of_images_done, images_per_second):
+            progress_bar.setValue(number_of_images_done)
+            images_per_second_label.setText(f'{images_per_second:.0f} images/s')
+
+        def show_done(number_of_images_done, cancelled):
+            if cancelled:
+                dialog.setWindowTitle(f'Cancelled after {number_of_images_done} images')
+            else:
+                dialog.setWindowTitle('Download complete')
+            cancel_button.setEnabled(False)
+
+        def show_error(message):
+            dialog.setWindowTitle('Download failed')
+            images_per_second_label.setText(message)
+            cancel_button.setEnabled(False)
+
+        def thread_finished():
+            self.image_generation_thread = None
+            self.pushButton_generate_images.setEnabled(True)
+            image_generation_thread.deleteLater()
+
+        image_generation_thread.progress.connect(show_progress)
+        image_generation_thread.done.connect(show_done)
+        image_generation_thread.failed.connect(show_error)
+        image_generation_thread.finished.connect(thread_finished)
+        cancel_button.clicked.connect(image_generation_thread.requestInterruption)
+        # closing the dialog cancels the job too
+        dialog.rejected.connect(image_generation_thread.requestInterruption)
+
+        self.pushButton_generate_images.setEnabled(False)
+        image_generation_thread.start()
         dialog.show()
 
-        for index in range(self.number_of_images_to_generate):
-            generated_polygon_image = chosen_polygon_generator.generate_polygon(number_of_vertices=number_of_vertices)
-            save_image_to_folder(folder_path=folder_to_save_to,
-                                 image_name=f'{image_name}_{index}',
-                                 image=generated_polygon_image,
-                                 file_format=file_format,
-                                 )
-            progress_bar.setValue(index)
-            QApplication.processEvents()
-
-        dialog.exec_()
+    def closeEvent(self, event):
+        # let a running job write its last images and annotations before the app exits
+        if self.image_generation_thread is not None:
+            self.image_generation_thread.requestInterruption()
+            self.image_generation_thread.wait()
+        super(PolygonGeneratorApp, self).closeEvent(event)
 
 
 def main():
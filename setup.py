@@ -5,16 +5,32 @@ DESCRIPTION = 'Module for generating images of polygons'
 VERSION = '0.0.1'
 AUTHOR = 'Veronica Lai'
 
+# the polygon_generator package only needs these, so it can run on headless machines
 INSTALL_REQUIRES = [
     'opencv_python',
     'numpy',
-    'pyqt5',
-    'pyqt5-tools',
-    'pyinstaller'
 ]
 
+# pip install polygongenerator[gui] for the GUI, and [build] as well to build its executable
+EXTRAS_REQUIRE = {
+    'gui': [
+        'pyqt5',
+        'pyqt5-tools',
+    ],
+    'build': [
+        'pyinstaller',
+    ],
+}
+
+# polygongenerator command to generate datasets without the GUI, see polygon_generator/cli.py
+ENTRY_POINTS = {
+    'console_scripts': [
+        'polygongenerator=polygon_generator.cli:main',
+    ],
+}
+
 # find packages and prefix them with the main package name
-PACKAGES = find_packages()
+PACKAGES = find_packages(exclude=['benchmarks'])
 
 setup(
     name=NAME,
@@ -23,6 +39,8 @@ setup(
     author=AUTHOR,
     url='TODO',
     install_requires=INSTALL_REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     packages=PACKAGES,
+    entry_points=ENTRY_POINTS,
     license='LICENSE',
 )
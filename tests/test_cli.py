@@ -0,0 +1,16 @@
+import pytest
+from polygon_generator.cli import main
+
+
+@pytest.mark.parametrize('arguments', [
+    ['--vertices', '99', '--image-height', '64', '--image-width', '64'],
+    ['--vertices', '3-20', '--convex-mode', 'hull', '--image-height', '64', '--image-width', '64'],
+    ['--vertices', '30', '--type', 'concave', '--concave-mode', 'two_opt', '--image-height', '5', '--image-width', '5'],
+    ['--vertices', '5', '--image-height', '10', '--height-bezels', '10'],
+])
+def test_vertices_that_do_not_fit_the_image_are_argument_errors(tmp_path, capsys, arguments):
+    with pytest.raises(SystemExit):
+        main(['--output', str(tmp_path), '--number-of-images', '1'] + arguments)
+
+    assert 'error:' in capsys.readouterr().err
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from polygon_generator.polygon_generator import ConcavePolygonGenerator
+
+
+def is_on_segment(point, start, end):
+    """
+    :return: bool, point is on the segment from start to end, ends included
+    """
+    cross = (end[0] - start[0]) * (point[1] - start[1]) - (end[1] - start[1]) * (point[0] - start[0])
+
+    return cross == 0 and min(start[0], end[0]) <= point[0] <= max(start[0], end[0]) and \
+        min(start[1], end[1]) <= point[1] <= max(start[1], end[1])
+
+
+def segments_meet(a, b, c, d):
+    """
+    :return: bool, the segments from a to b and from c to d have a point in common, touching included
+    """
+    def orientation(p, q, r):
+        return np.sign((q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0]))
+
+    if orientation(a, b, c) * orientation(a, b, d) < 0 and orientation(c, d, a) * orientation(c, d, b) < 0:
+        return True
+
+    return is_on_segment(c, a, b) or is_on_segment(d, a, b) or is_on_segment(a, c, d) or is_on_segment(b, c, d)
+
+
+def is_simple(polygon_vertices):
+    """
+    :param polygon_vertices: np.ndarray with shape (n, 1, 2), in order around the polygon
+    :return: bool, the vertices are distinct and no two edges meet, apart from neighbouring edges at their shared
+     vertex
+    """
+    vertices = [tuple(vertex) for vertex in polygon_vertices.reshape((-1, 2)).astype(np.int64).tolist()]
+    number_of_vertices = len(vertices)
+    if len(set(vertices)) < number_of_vertices:
+        return False
+
+    for first_edge in range(number_of_vertices):
+        a, b = vertices[first_edge], vertices[(first_edge + 1) % number_of_vertices]
+        # a neighbouring edge meets this one only at their shared vertex unless it doubles back along it
+        c = vertices[(first_edge + 2) % number_of_vertices]
+        if is_on_segment(c, a, b) or is_on_segment(a, b, c):
+            return False
+        for second_edge in range(first_edge + 2, number_of_vertices - (first_edge == 0)):
+            c, d = vertices[second_edge], vertices[(second_edge + 1) % number_of_vertices]
+            if segments_meet(a, b, c, d):
+                return False
+
+    return True
+
+
+def test_is_simple_finds_touching_edges_and_repeated_vertices():
+    assert is_simple(np.array([[0, 0], [4, 0], [4, 4], [0, 4]]))
+    # spike doubling back along the edge before it
+    assert not is_simple(np.array([[0, 0], [10, 0], [5, 0], [5, 5]]))
+    # vertex touching a non neighbouring edge
+    assert not is_simple(np.array([[0, 0], [4, 0], [2, 0], [2, 4], [0, 4]]))
+    assert not is_simple(np.array([[0, 0], [4, 0], [4, 4], [0, 0], [0, 4]]))
+
+
+@pytest.mark.parametrize('image_height, image_width, number_of_vertices, number_of_images', [
+    (40, 40, 3, 50),
+    (40, 40, 12, 50),
+    (128, 128, 40, 20),
+    (480, 480, 99, 20),
+])
+def test_two_opt_polygons_are_simple(image_height, image_width, number_of_vertices, number_of_images):
+    polygon_generator = ConcavePolygonGenerator(image_height=image_height,
+                                                image_width=image_width,
+                                                number_of_vertices=number_of_vertices,
+                                                seed=1)
+    polygon_generator.set_concave_mode('two_opt')
+    images, batch_vertices = polygon_generator.generate_batch(number_of_images=number_of_images)
+
+    for polygon_vertices in batch_vertices:
+        assert len(polygon_vertices) == number_of_vertices
+        assert is_simple(polygon_vertices)
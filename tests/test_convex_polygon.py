@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import polygon_generator.polygon_generator
+from polygon_generator.polygon_generator import ConvexPolygonGenerator, get_most_convex_vertices
+
+
+def count_strictly_convex_corners(polygon_vertices):
+    """
+    :param polygon_vertices: np.ndarray with shape (n, 1, 2), in order around the polygon
+    :return: int, number of corners turning the same way as the polygon, with no straight or reflex angle counted
+    """
+    vertices = polygon_vertices.reshape((-1, 2)).astype(np.int64)
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    next_edges = np.roll(edges, -1, axis=0)
+    turns = edges[:, 0] * next_edges[:, 1] - edges[:, 1] * next_edges[:, 0]
+    orientation = np.sign(turns.sum())
+
+    return int((np.sign(turns) == orientation).sum())
+
+
+@pytest.mark.parametrize('image_height, image_width, number_of_vertices', [
+    (480, 480, 3),
+    (480, 480, 50),
+    (480, 480, 99),
+    (125, 170, 9),
+    (125, 170, 41),
+])
+def test_exact_polygons_have_every_corner_after_rounding(image_height, image_width, number_of_vertices):
+    polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                               image_width=image_width,
+                                               number_of_vertices=number_of_vertices,
+                                               seed=0)
+    images, batch_vertices = polygon_generator.generate_batch(number_of_images=32)
+
+    for polygon_vertices in batch_vertices:
+        assert polygon_vertices.dtype == np.int32
+        assert len(polygon_vertices) == number_of_vertices
+        assert count_strictly_convex_corners(polygon_vertices) == number_of_vertices
+
+
+def test_exact_polygons_have_every_corner_with_image_indices():
+    polygon_generator = ConvexPolygonGenerator(image_height=64, image_width=64, number_of_vertices=20, seed=0)
+    images, batch_vertices = polygon_generator.generate_batch(number_of_images=16, first_image_index=0)
+
+    for polygon_vertices in batch_vertices:
+        assert count_strictly_convex_corners(polygon_vertices) == 20
+
+
+def test_exact_polygons_too_many_vertices_for_image():
+    polygon_generator = ConvexPolygonGenerator(image_height=32, image_width=32, number_of_vertices=40, seed=0)
+
+    with pytest.raises(ValueError):
+        polygon_generator.generate_batch(number_of_images=1)
+
+
+@pytest.mark.parametrize('image_height, image_width', [
+    (8, 8),
+    (16, 16),
+    (20, 20),
+    (100, 100),
+    (64, 480),
+    (1000, 1000),
+])
+def test_exact_polygons_with_the_most_vertices(image_height, image_width):
+    number_of_vertices = get_most_convex_vertices(convex_mode='exact', image_height=image_height,
+                                                  image_width=image_width)
+    polygon_generator = ConvexPolygonGenerator(image_height=image_height,
+                                               image_width=image_width,
+                                               number_of_vertices=number_of_vertices,
+                                               seed=0)
+    images, batch_vertices = polygon_generator.generate_batch(number_of_images=256)
+
+    for polygon_vertices in batch_vertices:
+        assert count_strictly_convex_corners(polygon_vertices) == number_of_vertices
+
+
+def test_convex_mode_too_many_vertices_for_image():
+    polygon_generator = ConvexPolygonGenerator(image_height=125, image_width=170, number_of_vertices=30, seed=0)
+    polygon_generator.set_convex_mode('exact')
+
+    with pytest.raises(ValueError):
+        polygon_generator.set_convex_mode('hull')
+    assert polygon_generator.convex_mode == 'exact'
+
+
+def test_hull_polygons_give_up_instead_of_hanging(monkeypatch):
+    monkeypatch.setattr(polygon_generator.polygon_generator, 'max_hull_retries', 10)
+    polygon_generator_ = ConvexPolygonGenerator(image_height=480, image_width=480, number_of_vertices=15, seed=0)
+    polygon_generator_.set_convex_mode('hull')
+
+    with pytest.raises(ValueError):
+        polygon_generator_.generate_polygon()
@@ -0,0 +1,52 @@
+import os
+import json
+import pytest
+from polygon_generator.dataset_generator import DatasetGenerator
+from polygon_generator.labels import annotation_file_name
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+
+
+def make_dataset_generator(folder_path, seed):
+    polygon_generator = ConvexPolygonGenerator(image_height=32, image_width=32, number_of_vertices=5, seed=seed)
+    return DatasetGenerator(polygon_generator=polygon_generator,
+                            folder_path=str(folder_path),
+                            number_of_images=4,
+                            images_per_shard=2,
+                            number_of_workers=1,
+                            file_format='png')
+
+
+def test_resume_with_a_different_seed_raises(tmp_path):
+    make_dataset_generator(tmp_path, seed=0).generate()
+    dataset_generator = make_dataset_generator(tmp_path, seed=99)
+
+    with pytest.raises(ValueError, match='entropy'):
+        dataset_generator.generate()
+    assert dataset_generator.polygon_generator.seed == 99
+
+
+def test_resume_without_a_seed_takes_the_dataset_seed(tmp_path):
+    make_dataset_generator(tmp_path, seed=7).generate()
+    dataset_generator = make_dataset_generator(tmp_path, seed=None)
+    dataset_generator.generate()
+
+    assert dataset_generator.polygon_generator.seed_sequence.entropy == 7
+
+
+def test_annotations_are_written_for_each_shard_and_merged(tmp_path):
+    dataset_generator = make_dataset_generator(tmp_path, seed=0)
+    dataset_generator.number_of_workers = 2
+    shard_paths = dataset_generator.generate()
+
+    with open(os.path.join(tmp_path, annotation_file_name)) as annotation_file:
+        annotations = json.load(annotation_file)
+    file_names = [image_entry['file_name'] for image_entry in annotations['images']]
+    assert [image_entry['id'] for image_entry in annotations['images']] == [0, 1, 2, 3]
+    assert [annotation['image_id'] for annotation in annotations['annotations']] == [0, 1, 2, 3]
+    assert all(os.path.exists(os.path.join(tmp_path, file_name)) for file_name in file_names)
+    assert all(os.path.exists(os.path.join(shard_path, annotation_file_name)) for shard_path in shard_paths)
+
+    polygon_generator = dataset_generator.polygon_generator
+    images, batch_vertices = polygon_generator.generate_batch(number_of_images=4, first_image_index=0)
+    for annotation, polygon_vertices in zip(annotations['annotations'], batch_vertices):
+        assert annotation['segmentation'] == [polygon_vertices.reshape(-1).tolist()]
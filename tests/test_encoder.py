@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+import pytest
+from polygon_generator.encoder import ImageEncoder
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+
+
+def test_unset_settings_are_left_to_cv2():
+    image_encoder = ImageEncoder()
+
+    for file_format in ('jpg', 'png', 'webp', 'tiff', 'bmp'):
+        assert image_encoder.get_parameters(file_format) == []
+
+
+def test_set_settings_are_given_to_cv2():
+    image_encoder = ImageEncoder(png_compression=1)
+
+    assert image_encoder.get_parameters('png') == [cv2.IMWRITE_PNG_COMPRESSION, 1]
+
+
+@pytest.mark.parametrize('file_format', ['png', 'tiff'])
+def test_bilevel_label_canvas_round_trip(file_format):
+    polygon_generator = ConvexPolygonGenerator(image_height=64, image_width=64, number_of_vertices=6, seed=0)
+    polygon_generator.set_canvas_mode('label')
+    image = polygon_generator.generate_polygon()
+    assert set(np.unique(image)) == {0, 1}
+
+    encoded_image = ImageEncoder(bilevel=True).encode(image, file_format)
+    decoded_image = cv2.imdecode(encoded_image, cv2.IMREAD_GRAYSCALE)
+
+    np.testing.assert_array_equal(decoded_image > 0, image.reshape(decoded_image.shape) > 0)
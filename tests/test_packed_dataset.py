@@ -0,0 +1,30 @@
+import os
+import numpy as np
+import pytest
+from polygon_generator.packed_dataset import NpyDatasetSink, TarShardSink, TarShardDataset
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+
+
+def test_npy_sink_rejects_too_many_vertices(tmp_path):
+    images = np.zeros((1, 8, 8, 3), np.uint8)
+    with NpyDatasetSink(file_path=os.path.join(tmp_path, 'images.npy'), number_of_images=1, image_height=8,
+                        image_width=8, max_number_of_vertices=4) as sink:
+        with pytest.raises(ValueError):
+            sink.add_batch(images=images, batch_vertices=[np.zeros((5, 1, 2), np.int32)])
+        assert sink.number_of_images_added == 0
+
+
+def test_tar_dataset_closes_with_encoded_images_alive(tmp_path):
+    polygon_generator = ConvexPolygonGenerator(image_height=32, image_width=32, number_of_vertices=5, seed=0)
+    images, batch_vertices = polygon_generator.generate_batch(number_of_images=4)
+    with TarShardSink(folder_path=str(tmp_path), images_per_shard=2, file_format='png') as sink:
+        sink.add_batch(images=images, batch_vertices=batch_vertices)
+
+    dataset = TarShardDataset(folder_path=str(tmp_path))
+    encoded_image = dataset.get_encoded_image(0)
+    image, polygon_vertices = dataset[1]
+    dataset.close()
+
+    assert len(encoded_image)
+    np.testing.assert_array_equal(image, images[1])
+    np.testing.assert_array_equal(polygon_vertices, batch_vertices[1])
@@ -0,0 +1,36 @@
+import numpy as np
+from polygon_generator.polygon_generator import ConvexPolygonGenerator
+from polygon_generator.rasterizer import Rasterizer
+from polygon_generator.scene_generator import SceneGenerator
+
+
+def draw_scene(rasterizer_mode):
+    polygon_generator = ConvexPolygonGenerator(image_height=128, image_width=128, number_of_vertices=6, seed=0)
+    polygon_generator.set_rasterizer_mode(rasterizer_mode)
+    scene_generator = SceneGenerator(polygon_generator=polygon_generator, number_of_polygons=10, max_overlap=1)
+
+    image, scene_vertices, bounding_boxes = scene_generator.generate_scene(image_index=0)
+
+    return image.copy(), scene_vertices
+
+
+def test_sub_pixel_draws_fractional_vertices():
+    polygon_vertices = np.array([[10.3, 10.6], [40.7, 12.2], [25.4, 35.9]])
+    images = {}
+    for rasterizer_mode in ('anti_aliased', 'sub_pixel'):
+        image = np.zeros((48, 48), np.uint8)
+        Rasterizer(rasterizer_mode).fill_polygon(image=image, polygon_vertices=polygon_vertices, colour=255)
+        images[rasterizer_mode] = image
+
+    assert not np.array_equal(images['anti_aliased'], images['sub_pixel'])
+
+
+def test_sub_pixel_scene_keeps_fractional_vertices():
+    sub_pixel_image, sub_pixel_vertices = draw_scene('sub_pixel')
+    anti_aliased_image, anti_aliased_vertices = draw_scene('anti_aliased')
+
+    assert len(sub_pixel_vertices) == len(anti_aliased_vertices)
+    assert all(polygon_vertices.dtype == np.float64 for polygon_vertices in sub_pixel_vertices)
+    assert any((polygon_vertices % 1 != 0).any() for polygon_vertices in sub_pixel_vertices)
+    assert all(polygon_vertices.dtype == np.int32 for polygon_vertices in anti_aliased_vertices)
+    assert not np.array_equal(sub_pixel_image, anti_aliased_image)
@@ -0,0 +1,143 @@
+import os
+import shutil
+import numpy as np
+import pytest
+from polygon_generator.dataset_generator import DatasetGenerator, shard_complete_file_name
+from polygon_generator.polygon_generator import ConvexPolygonGenerator, ConcavePolygonGenerator
+
+# image k of a seeded dataset is drawn from its own random generator, so it must come out bit-identical however it is
+#  generated: alone, in a batch of any size, streamed, prefetched, by any number of workers or after resuming
+number_of_images = 10
+
+
+def make_polygon_generator(polygon_type, mode):
+    if polygon_type == 'convex':
+        polygon_generator = ConvexPolygonGenerator(image_height=48, image_width=48, number_of_vertices=6, seed=3)
+        polygon_generator.set_convex_mode(mode)
+    else:
+        polygon_generator = ConcavePolygonGenerator(image_height=48, image_width=48, number_of_vertices=6, seed=3)
+        polygon_generator.set_concave_mode(mode)
+
+    return polygon_generator
+
+
+def generate_one_at_a_time(polygon_generator):
+    images = []
+    batch_vertices = []
+    for image_index in range(number_of_images):
+        images.append(polygon_generator.generate_polygon(image_index=image_index).copy())
+        batch_vertices.append(polygon_generator.polygon_vertices)
+
+    return np.stack(images), batch_vertices
+
+
+def assert_same_images(images, expected_images, batch_vertices, expected_batch_vertices):
+    np.testing.assert_array_equal(images, expected_images)
+    for polygon_vertices, expected_polygon_vertices in zip(batch_vertices, expected_batch_vertices):
+        np.testing.assert_array_equal(polygon_vertices, expected_polygon_vertices)
+
+
+polygon_modes = [
+    ('convex', 'exact'),
+    ('convex', 'hull'),
+    ('concave', 'angle'),
+    ('concave', 'star'),
+    ('concave', 'two_opt'),
+]
+
+
+@pytest.mark.parametrize('polygon_type, mode', polygon_modes)
+@pytest.mark.parametrize('batch_size', [1, 3, number_of_images])
+def test_batches_match_images_drawn_alone(polygon_type, mode, batch_size):
+    expected_images, expected_batch_vertices = generate_one_at_a_time(make_polygon_generator(polygon_type, mode))
+
+    polygon_generator = make_polygon_generator(polygon_type, mode)
+    images = []
+    batch_vertices = []
+    for batch_start in range(0, number_of_images, batch_size):
+        batch_images, batch_polygon_vertices = polygon_generator.generate_batch(
+            number_of_images=min(batch_size, number_of_images - batch_start),
+            first_image_index=batch_start)
+        images.extend(batch_images)
+        batch_vertices.extend(batch_polygon_vertices)
+
+    assert_same_images(np.stack(images), expected_images, batch_vertices, expected_batch_vertices)
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_streams_match_images_drawn_alone(prefetch):
+    expected_images, expected_batch_vertices = generate_one_at_a_time(make_polygon_generator('convex', 'exact'))
+
+    polygon_generator = make_polygon_generator('convex', 'exact')
+    images = []
+    batch_vertices = []
+    for image, polygon_vertices, metadata in polygon_generator.stream_polygons(number_of_images=number_of_images,
+                                                                               batch_size=4,
+                                                                               prefetch=prefetch,
+                                                                               first_image_index=0):
+        # the images streamed are views into the ring of batch buffers
+        images.append(image.copy())
+        batch_vertices.append(polygon_vertices)
+
+    assert_same_images(np.stack(images), expected_images, batch_vertices, expected_batch_vertices)
+
+
+def test_reused_image_matches_new_images():
+    expected_images, expected_batch_vertices = generate_one_at_a_time(make_polygon_generator('concave', 'angle'))
+
+    polygon_generator = make_polygon_generator('concave', 'angle')
+    polygon_generator.set_reuse_image(True)
+    images, batch_vertices = generate_one_at_a_time(polygon_generator)
+
+    assert_same_images(images, expected_images, batch_vertices, expected_batch_vertices)
+
+
+def read_dataset_files(folder_path):
+    """
+    :return: dict, of the bytes of every image file of a dataset folder, by its path relative to the folder
+    """
+    dataset_files = {}
+    for shard_name in sorted(os.listdir(folder_path)):
+        shard_path = os.path.join(folder_path, shard_name)
+        if not os.path.isdir(shard_path):
+            continue
+        for file_name in sorted(os.listdir(shard_path)):
+            if file_name.endswith('.png'):
+                with open(os.path.join(shard_path, file_name), 'rb') as image_file:
+                    dataset_files[os.path.join(shard_name, file_name)] = image_file.read()
+
+    return dataset_files
+
+
+def generate_dataset(folder_path, number_of_workers):
+    dataset_generator = DatasetGenerator(polygon_generator=make_polygon_generator('convex', 'exact'),
+                                         folder_path=str(folder_path),
+                                         number_of_images=number_of_images,
+                                         images_per_shard=3,
+                                         number_of_workers=number_of_workers,
+                                         file_format='png',
+                                         batch_size=2)
+    return dataset_generator.generate()
+
+
+def test_dataset_is_the_same_with_any_number_of_workers(tmp_path):
+    generate_dataset(tmp_path / 'one_worker', number_of_workers=1)
+    generate_dataset(tmp_path / 'three_workers', number_of_workers=3)
+
+    dataset_files = read_dataset_files(tmp_path / 'one_worker')
+    assert len(dataset_files) == number_of_images
+    assert dataset_files == read_dataset_files(tmp_path / 'three_workers')
+
+
+def test_resumed_dataset_is_the_same(tmp_path):
+    generate_dataset(tmp_path / 'whole', number_of_workers=1)
+    shard_paths = generate_dataset(tmp_path / 'resumed', number_of_workers=1)
+
+    # an interrupted shard has some of its images but no shard_complete file
+    shutil.rmtree(shard_paths[1])
+    os.remove(os.path.join(shard_paths[2], shard_complete_file_name))
+    os.remove(os.path.join(shard_paths[2], min(file_name for file_name in os.listdir(shard_paths[2])
+                                               if file_name.endswith('.png'))))
+    generate_dataset(tmp_path / 'resumed', number_of_workers=2)
+
+    assert read_dataset_files(tmp_path / 'resumed') == read_dataset_files(tmp_path / 'whole')